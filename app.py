@@ -1,8 +1,42 @@
 import dash
-from dash import Dash, html, dcc, Input, Output
+from dash import Dash, html, dcc, Input, Output, ClientsideFunction
 
-app = Dash(__name__, use_pages=True)
+from utils import figures
+from utils.callback_metrics import CallbackMetrics
+from utils.compression import Compression
+from utils.images import add_immutable_cache_headers, responsive_image
+from utils.lazy_pages import LazyPages, lazy_pages_enabled
+from utils.memory_profiling import MemoryProfiler, tracemalloc_frames
+from utils.profiling import CallbackProfiler
+from utils.search import page_index_store
+from utils.server_timing import ServerTiming
+
+# MATHTUTOR_LAZY_PAGES=1 imports each page module on its first request instead of at startup
+LAZY_PAGES = lazy_pages_enabled()
+
+app = Dash(
+    __name__,
+    use_pages=True,
+    pages_folder="" if LAZY_PAGES else "pages",
+    # Validating callbacks against every page layout would import every page
+    suppress_callback_exceptions=LAZY_PAGES,
+)
 server = app.server
+if LAZY_PAGES:
+    LazyPages(app)
+# Per-callback latency and payload histograms on /metrics
+CallbackMetrics(app)
+# Phase breakdown of each callback request for the browser's devtools
+ServerTiming(server)
+# Profiles callbacks named in MATHTUTOR_PROFILE or armed on /_admin/profile
+CallbackProfiler(app)
+# MATHTUTOR_TRACEMALLOC=1 attributes allocations to callbacks, see /_admin/memory
+if tracemalloc_frames():
+    MemoryProfiler(app, frames=tracemalloc_frames())
+# The figure template, sent once instead of with every figure
+figures.register_template(app)
+add_immutable_cache_headers(server)
+Compression(server)
 
 app.layout = html.Div([
 
@@ -17,6 +51,9 @@ app.layout = html.Div([
         style={"textAlign": "left", "margin": "20px"}
     ),
 
+    # Full-text index of all pages, built once and searched in the browser
+    page_index_store(app, dash.page_registry, reload_pages=LAZY_PAGES),
+
     # ---------- LINKS + IMAGE SIDE BY SIDE ----------
     html.Div([
 
@@ -35,16 +72,18 @@ app.layout = html.Div([
 
         # --- Left image ---
         html.Div([
-            html.Img(
-                src="/assets/Math_tutor_app_3.png",
+            responsive_image(
+                "Math_tutor_app_3.png",
+                sizes="500px",
                 style={'width': '500px'}
             )
         ]),
 
         # --- Right image ---
         html.Div([
-            html.Img(
-                src="/assets/Math_tutor_app_3_flipped.png",
+            responsive_image(
+                "Math_tutor_app_3_flipped.png",
+                sizes="500px",
                 style={'width': '500px'}
             )
         ]),
@@ -65,25 +104,16 @@ app.layout = html.Div([
 ])
 
 
-@app.callback(
+# Runs filter_pages from assets/page_search.js, no server round trip per keystroke
+app.clientside_callback(
+    ClientsideFunction(namespace="search", function_name="filter_pages"),
     Output("page-links-container", "children"),
-    Input("search-pages", "value")
+    Input("search-pages", "value"),
+    Input("page-index", "data")
 )
-def filter_pages(search_value):
-    search_value = (search_value or "").lower()
-    links = []
-
-    for page in dash.page_registry.values():
-        if search_value in page["name"].lower():
-            links.append(
-                html.Div(
-                    dcc.Link(page["name"], href=page["path"]),
-                    style={"marginBottom": "8px"}
-                )
-            )
-
-    return links
 
 
 if __name__ == '__main__':
+    # Check the plain-dict figures against plotly's validators while developing
+    figures.VALIDATE = True
     app.run(debug=True)
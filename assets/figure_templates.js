@@ -0,0 +1,56 @@
+// Figure templates shipped once per page load, see utils/figures.py.
+// Figures from the server name their template (layout.template = "mathtutor")
+// instead of carrying it in every callback response. window.figureTemplates
+// holds the templates by name; this swaps the name for the template whenever
+// dcc.Graph hands a figure to plotly.js.
+(function () {
+    var PATCHED = ["newPlot", "react", "animate"];
+
+    function withTemplate(layout) {
+        var templates = window.figureTemplates || {};
+        if (!layout || typeof layout.template !== "string" || !templates[layout.template]) {
+            return layout;
+        }
+        return Object.assign({}, layout, {template: templates[layout.template]});
+    }
+
+    function patch(Plotly) {
+        if (!Plotly || Plotly._figureTemplates) {
+            return;
+        }
+        Plotly._figureTemplates = true;
+        PATCHED.forEach(function (method) {
+            var original = Plotly[method];
+            Plotly[method] = function () {
+                var args = Array.prototype.slice.call(arguments);
+                var figure = args[1];
+                if (figure && typeof figure === "object" && !Array.isArray(figure)) {
+                    // (gd, {data, layout, ...}), how dcc.Graph calls plotly.js
+                    args[1] = Object.assign({}, figure, {layout: withTemplate(figure.layout)});
+                } else if (method !== "animate" && args.length > 2) {
+                    // (gd, data, layout, config)
+                    args[2] = withTemplate(args[2]);
+                }
+                return original.apply(this, args);
+            };
+        });
+    }
+
+    if (window.Plotly) {
+        patch(window.Plotly);
+        return;
+    }
+    // dcc.Graph loads plotly.js after the assets, patch it as soon as it is set
+    var plotly;
+    Object.defineProperty(window, "Plotly", {
+        configurable: true,
+        enumerable: true,
+        get: function () {
+            return plotly;
+        },
+        set: function (value) {
+            plotly = value;
+            patch(value);
+        }
+    });
+})();
@@ -0,0 +1,47 @@
+// Lazy loading for images rendered by utils/images.py.
+// Dash's html.Img has no `loading` prop, so the real srcset/src are kept in
+// data-* attributes and copied over once the picture comes into view.
+(function () {
+    function load(img) {
+        var picture = img.parentNode;
+        if (picture && picture.tagName === "PICTURE") {
+            picture.querySelectorAll("source[data-srcset]").forEach(function (source) {
+                source.srcset = source.dataset.srcset;
+                source.removeAttribute("data-srcset");
+            });
+        }
+        if (img.dataset.srcset) {
+            img.srcset = img.dataset.srcset;
+            img.removeAttribute("data-srcset");
+        }
+        img.src = img.dataset.src;
+        img.removeAttribute("data-src");
+    }
+
+    var observer = "IntersectionObserver" in window ? new IntersectionObserver(function (entries) {
+        entries.forEach(function (entry) {
+            if (entry.isIntersecting) {
+                observer.unobserve(entry.target);
+                load(entry.target);
+            }
+        });
+    }, {rootMargin: "200px"}) : null;
+
+    function scan() {
+        document.querySelectorAll("img[data-src]").forEach(function (img) {
+            if (img.dataset.lazyObserved) {
+                return;
+            }
+            img.dataset.lazyObserved = "1";
+            if (observer) {
+                observer.observe(img);
+            } else {
+                load(img);
+            }
+        });
+    }
+
+    // Dash renders the layout after this script runs, so watch for new images
+    new MutationObserver(scan).observe(document.documentElement, {childList: true, subtree: true});
+    scan();
+})();
@@ -0,0 +1,182 @@
+// Clientside page search for the search box in app.py.
+// The page index (see utils/search.py) is sent once with the layout in the
+// dcc.Store "page-index", so typing in the search box never makes a request
+// to the server.
+window.dash_clientside = window.dash_clientside || {};
+
+(function () {
+    var TOKEN = /[\p{L}\p{N}_]+/gu;
+    var FUZZY_MIN_LENGTH = 3;
+    var FUZZY_MIN_SIMILARITY = 0.4;
+
+    var stopwordCache = {index: null, words: null};
+
+    function stopwords(index) {
+        if (stopwordCache.index !== index) {
+            stopwordCache.index = index;
+            stopwordCache.words = new Set(index.stopwords || []);
+        }
+        return stopwordCache.words;
+    }
+
+    function tokenize(text, index) {
+        var skip = stopwords(index);
+        return (text.match(TOKEN) || []).filter(function (t) {
+            return t.length > 1 && !skip.has(t);
+        });
+    }
+
+    function trigrams(term) {
+        var padded = " " + term + " ";
+        var result = new Set();
+        for (var i = 0; i < padded.length - 2; i++) {
+            result.add(padded.slice(i, i + 3));
+        }
+        return result;
+    }
+
+    // First position in the sorted terms list that is >= query
+    function lowerBound(terms, query) {
+        var lo = 0, hi = terms.length;
+        while (lo < hi) {
+            var mid = (lo + hi) >> 1;
+            if (terms[mid] < query) {
+                lo = mid + 1;
+            } else {
+                hi = mid;
+            }
+        }
+        return lo;
+    }
+
+    // {term id: weight} for an exact match (3), prefix matches (2) or,
+    // if neither exists, misspellings found through shared trigrams (< 1)
+    function matchTerms(index, token) {
+        var matches = {};
+        var found = false;
+        for (var i = lowerBound(index.terms, token); i < index.terms.length; i++) {
+            var term = index.terms[i];
+            if (!term.startsWith(token)) {
+                break;
+            }
+            matches[i] = term === token ? 3 : 2;
+            found = true;
+        }
+        if (found || token.length < FUZZY_MIN_LENGTH) {
+            return matches;
+        }
+
+        var queryTrigrams = trigrams(token);
+        var shared = {};
+        queryTrigrams.forEach(function (trigram) {
+            (index.trigrams[trigram] || []).forEach(function (termId) {
+                shared[termId] = (shared[termId] || 0) + 1;
+            });
+        });
+        Object.keys(shared).forEach(function (termId) {
+            // A space padded term of length n has (at most) n trigrams
+            var termTrigrams = index.terms[termId].length;
+            var similarity = 2 * shared[termId] / (queryTrigrams.size + termTrigrams);
+            if (similarity >= FUZZY_MIN_SIMILARITY) {
+                matches[termId] = similarity;
+            }
+        });
+        return matches;
+    }
+
+    // {page id: score} for pages that match every token of the query
+    function textScores(index, tokens) {
+        var scores = null;
+        tokens.forEach(function (token) {
+            var tokenScores = {};
+            var matches = matchTerms(index, token);
+            Object.keys(matches).forEach(function (termId) {
+                index.postings[termId].forEach(function (pageId) {
+                    tokenScores[pageId] = Math.max(tokenScores[pageId] || 0, matches[termId]);
+                });
+            });
+            if (scores === null) {
+                scores = tokenScores;
+                return;
+            }
+            var both = {};
+            Object.keys(scores).forEach(function (pageId) {
+                if (pageId in tokenScores) {
+                    both[pageId] = scores[pageId] + tokenScores[pageId];
+                }
+            });
+            scores = both;
+        });
+        return scores || {};
+    }
+
+    // Higher is better, 0 means the page name does not contain the query
+    function nameScore(name, query) {
+        if (name === query) {
+            return 4;
+        }
+        if (name.startsWith(query)) {
+            return 3;
+        }
+        var index = name.indexOf(query);
+        if (index === -1) {
+            return 0;
+        }
+        // Match at the start of a word beats one in the middle of a word
+        return /[\s\-(]/.test(name.charAt(index - 1)) ? 2 : 1;
+    }
+
+    function pageLink(name, path, reload) {
+        return {
+            namespace: "dash_html_components",
+            type: "Div",
+            props: {
+                children: {
+                    namespace: "dash_core_components",
+                    type: "Link",
+                    props: {children: name, href: path, refresh: reload}
+                },
+                style: {marginBottom: "8px"}
+            }
+        };
+    }
+
+    function search(index, searchValue) {
+        var query = (searchValue || "").trim().toLowerCase();
+        if (!query) {
+            return index.pages.map(function (_, pageId) {
+                return pageId;
+            });
+        }
+
+        var text = textScores(index, tokenize(query, index));
+        var ranked = [];
+        index.pages.forEach(function (page, pageId) {
+            var byName = nameScore(page[0].toLowerCase(), query);
+            var byText = text[pageId] || 0;
+            if (byName > 0 || byText > 0) {
+                ranked.push({pageId: pageId, name: byName, text: byText});
+            }
+        });
+        // Name matches first, then text relevance, registry order among ties
+        ranked.sort(function (a, b) {
+            return b.name - a.name || b.text - a.text || a.pageId - b.pageId;
+        });
+        return ranked.map(function (r) {
+            return r.pageId;
+        });
+    }
+
+    window.dash_clientside.search = {
+        search: search,
+        filter_pages: function (searchValue, pageIndex) {
+            if (!pageIndex) {
+                return [];
+            }
+            return search(pageIndex, searchValue).map(function (pageId) {
+                var page = pageIndex.pages[pageId];
+                return pageLink(page[0], page[1], Boolean(pageIndex.reload));
+            });
+        }
+    };
+})();
@@ -0,0 +1,115 @@
+// Clientside callbacks for the angle buttons of the unit circle pages.
+// pages/trig_curve_unit_circle.py and pages/trig_all_solutions.py render their
+// figures at angle 0; these functions move the traces and annotations that
+// depend on the angle, without a request to the server. The Python functions
+// in those pages are the reference, scripts/check_unit_circle_parity.py
+// compares the figures of both for a range of clicks.
+window.dash_clientside = window.dash_clientside || {};
+
+(function () {
+    // The keys patch_items in utils/figures.py sends
+    var MOVING = ["x", "y", "text"];
+
+    function angle(nLeft, nRight) {
+        return 0.1 * (nRight - nLeft);
+    }
+
+    // np.round(value, 2): rounds halves to even
+    function round2(value) {
+        var scaled = value * 100;
+        var rounded = Math.abs(scaled % 1) === 0.5 ? 2 * Math.round(scaled / 2) : Math.round(scaled);
+        return rounded / 100;
+    }
+
+    // Python's str() of a float: 1.0, -0.0, 0.64
+    function pyFloat(value) {
+        if (value === 0) {
+            return Object.is(value, -0) ? "-0.0" : "0.0";
+        }
+        var text = String(value);
+        return Number.isInteger(value) && text.indexOf("e") < 0 ? text + ".0" : text;
+    }
+
+    // Moving traces of the sinus graph, from data[1] on (angle_traces)
+    function sinCurveTraces(n) {
+        var s = Math.sin(n);
+        return [
+            {x: [n], y: [s]},
+            {x: [0, n], y: [s, s], text: ["sin(v) = " + pyFloat(round2(s))]},
+            {x: [n, n], y: [0, s], text: ["v = " + pyFloat(round2(n))]}
+        ];
+    }
+
+    // unity_circle_traces and unity_circle_annotation of trig_curve_unit_circle.py
+    function unityCircleTraces(n) {
+        var x = Math.cos(n), y = Math.sin(n);
+        return [
+            {x: [0, x], y: [0, y]},
+            {x: [0, x], y: [y, y], text: ["sin(v) = " + pyFloat(round2(y))]}
+        ];
+    }
+
+    function unityCircleAnnotations(n) {
+        return [{x: Math.cos(n) / 3, y: Math.sin(n) / 3, text: "v = " + pyFloat(round2(n))}];
+    }
+
+    // unity_circle_traces and unity_circle_annotations of trig_all_solutions.py
+    function bothAnglesTraces(n) {
+        var x = Math.cos(n), y = Math.sin(n);
+        return [
+            {x: [0, x], y: [0, y]},
+            {x: [0, -x], y: [0, y]},
+            {x: [0, x], y: [0, -y]},
+            {x: [-x, x], y: [y, y], text: ["sin(v1) = sin(v2) = " + pyFloat(round2(y))]},
+            {x: [x, x], y: [-y, y], text: ["cos(v1) = cos(v3) = " + pyFloat(round2(x))]}
+        ];
+    }
+
+    function bothAnglesAnnotations(n) {
+        var x = Math.cos(n), y = Math.sin(n);
+        return [
+            {x: x / 3, y: y / 3, text: "v1 = " + pyFloat(round2(n))},
+            {x: -x / 3, y: y / 3, text: "v2 = " + pyFloat(round2(Math.PI - n))},
+            {x: x / 3, y: -y / 3, text: "v3 = " + pyFloat(round2(-n))}
+        ];
+    }
+
+    // A copy of list with the moving keys of items merged into list[start], list[start + 1], ...
+    function patchItems(list, items, start) {
+        var result = list.slice();
+        items.forEach(function (item, i) {
+            var merged = Object.assign({}, result[start + i]);
+            MOVING.forEach(function (key) {
+                if (key in item) {
+                    merged[key] = item[key];
+                }
+            });
+            result[start + i] = merged;
+        });
+        return result;
+    }
+
+    function moved(figure, traces, start, annotations) {
+        var result = Object.assign({}, figure, {data: patchItems(figure.data, traces, start)});
+        if (annotations) {
+            result.layout = Object.assign({}, figure.layout, {
+                annotations: patchItems(figure.layout.annotations, annotations, 0)
+            });
+        }
+        return result;
+    }
+
+    window.dash_clientside.unit_circle = {
+        sin_curve: function (nLeft, nRight, figure) {
+            return moved(figure, sinCurveTraces(angle(nLeft, nRight)), 1);
+        },
+        unity_circle: function (nLeft, nRight, figure) {
+            var n = angle(nLeft, nRight);
+            return moved(figure, unityCircleTraces(n), 0, unityCircleAnnotations(n));
+        },
+        both_angles: function (nLeft, nRight, figure) {
+            var n = angle(nLeft, nRight);
+            return moved(figure, bothAnglesTraces(n), 0, bothAnglesAnnotations(n));
+        }
+    };
+})();
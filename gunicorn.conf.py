@@ -0,0 +1,79 @@
+"""Production gunicorn settings, picked up automatically by `gunicorn app:server`.
+
+- The app is preloaded in the master process, so the page registry, page
+  layouts and module level geometry are built once and shared copy-on-write
+  by all workers.
+- Workers and threads are sized from the CPUs available to the container.
+  Callbacks are short and CPU bound (numpy + plotly), so there is about one
+  worker per CPU plus one, and a few threads per worker to overlap network
+  I/O of the small _dash-update-component POSTs.
+- Timeouts are tuned for those short POSTs.
+
+Every value can be overridden with an environment variable (see below) or
+on the command line. scripts/benchmark_gunicorn.py compares this profile with
+gunicorn's defaults.
+"""
+import gc
+import math
+import os
+
+
+def available_cpus():
+    """CPUs this process may use, honouring affinity and cgroup v2 CPU quotas."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        with open("/sys/fs/cgroup/cpu.max", encoding="utf-8") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+CPUS = available_cpus()
+
+bind = os.environ.get("GUNICORN_BIND", f"0.0.0.0:{os.environ.get('PORT', '8000')}")
+
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") == "1"
+if preload_app:
+    # Lazy page loading would defeat sharing the imported pages between workers
+    os.environ["MATHTUTOR_LAZY_PAGES"] = "0"
+
+worker_class = "gthread"
+workers = int(os.environ.get("WEB_CONCURRENCY", CPUS + 1))
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+
+# Browsers send a burst of callback POSTs per click, keep the connection open
+# between them but not long enough to tie up threads on idle tabs
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 5))
+# No callback should take more than a few hundred ms, a stuck worker is restarted
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = 20
+
+# Recycle workers now and then to bound slow RSS growth over a school day
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 5000))
+max_requests_jitter = max_requests // 10
+
+accesslog = os.environ.get("GUNICORN_ACCESSLOG")
+errorlog = "-"
+
+
+def when_ready(server):
+    """Finish the per-process app setup in the master before any worker is forked."""
+    if not preload_app:
+        return
+    import app  # pylint: disable=import-outside-toplevel
+
+    # Run Dash's first-request setup (callback map, script tags, page router)
+    # here, otherwise every worker repeats it on its first request
+    with app.server.test_request_context("/"):
+        app.server.preprocess_request()
+
+    # Move everything built so far out of the garbage collector's reach, so
+    # collections in the workers do not write to (and un-share) those pages
+    gc.collect()
+    gc.freeze()
@@ -0,0 +1,105 @@
+import dash
+from dash import dcc, html, Input, Output, callback, no_update
+import numpy as np
+
+from utils import equations
+from utils.figures import Figure, scatter
+
+dash.register_page(module = __name__, name = "Equation solutions", description = "Find all solutions of an equation f(x) = c, such as cos(x) = 0.5, tan(x) = 1 or x^3 - 2*x = 0")
+
+# Points of the plotted curve, the roots are found on the (denser) sample points
+PLOT_POINTS = 2001
+SAMPLE_POINTS = [1000, 10_000, 100_000, 1_000_000]
+# Solutions written out below the graph
+LISTED_ROOTS = 20
+
+layout = html.Div([
+    html.H4('Equation solutions', style={"font-size": "30px", "text-align": "center"}),
+    html.P("Type a function f(x) and a value c to see every solution of f(x) = c in the window as the intersections between the horizontal line y = c and the graph of f. Use x, pi, e, + - * / ^ and sin, cos, tan, exp, log, sqrt, abs, for example cos(x), tan(x) or x^3 - 2*x", style={"text-align": "center"}),
+    dcc.Graph(id="equation_graph"),
+    html.B(id = "equation_solutions", style={"font-size": "30px"}),
+    html.Div([
+        html.P("f(x)"),
+        dcc.Input(id="equation-f", type="text", value="cos(x)", debounce=True, style={'width': '300px'}),
+        html.P("c"),
+        dcc.Input(id="equation-c", type="number", value=0.5, debounce=True),
+    ]),
+    html.Div([
+        html.P("Window (x from, to)"),
+        dcc.Input(id="equation-x-from", type="number", value=-10, debounce=True),
+        dcc.Input(id="equation-x-to", type="number", value=10, debounce=True),
+        html.P("Sample points"),
+        dcc.Dropdown(id="equation-points", options=SAMPLE_POINTS, value=10_000, clearable=False, style={'width': '140px'}),
+    ]),
+    html.P("Created by Christian Schwerdt", style={"font-style": "italic", "text-align": "right"}),
+    ])
+
+
+def equation_figure(f, c, window, x_roots):
+    # Typed windows would only evict the trig pages' cached grids
+    x = np.linspace(*window, PLOT_POINTS)
+    y = f(x)
+    finite = y[np.isfinite(y)]
+    if len(finite):
+        low, high = np.percentile(finite, [2, 98])
+        low, high = min(low, c), max(high, c)
+    else:
+        low, high = c, c
+    margin = max(high - low, 1) * 0.1
+    # Lines across poles (tan at pi/2) would cross the whole graph, gaps instead
+    y = np.where(np.abs(y - (low + high) / 2) > 10 * (high - low + margin), np.nan, y)
+
+    trace1 = scatter(
+        x=x,
+        y=y,
+        mode='lines',
+        name="f(x)",
+    )
+
+    trace2 = scatter(
+        x = x_roots,
+        y = np.full(len(x_roots), float(c)),
+        mode = "markers",
+        name = "solutions",
+    )
+
+    fig = Figure(data=[trace1, trace2])
+    fig.add_hline(y = c)
+    fig.update_layout(showlegend=True)
+    fig.update_xaxes(range=list(window))
+    fig.update_yaxes(range=[low - margin, high + margin])
+    fig.update_traces (marker_size = 12)
+
+    return fig
+
+
+@callback(Output("equation_graph", "figure"), Output("equation_solutions", "children"), Input("equation-f", "value"), Input("equation-c", "value"), Input("equation-x-from", "value"), Input("equation-x-to", "value"), Input("equation-points", "value"))
+def solve_equation(text, c, x_from, x_to, points):
+    if c is None or x_from is None or x_to is None:
+        return no_update, "Enter c and the window"
+    if not x_from < x_to:
+        return no_update, "The window must start before it ends"
+    if not isinstance(points, int) or points not in SAMPLE_POINTS:
+        return no_update, f"Sample points must be one of {', '.join(map(str, SAMPLE_POINTS))}"
+    try:
+        f = equations.parse(text)
+    except ValueError as error:
+        return no_update, f"f(x) = {text}: {error}"
+
+    window = (x_from, x_to)
+    # A million points take 8 MB
+    x = np.linspace(x_from, x_to, points)
+    # f evaluated once on the samples, for both checks
+    g = f(x) - c
+    if not np.any(g):
+        return equation_figure(f, c, window, []), f"{text} = {c} =======> every x"
+    x_roots, truncated = equations.roots(f, c, x, g)
+
+    if not len(x_roots):
+        answer = "no solution"
+    else:
+        listed = ", ".join(str(value) for value in np.round(x_roots[:LISTED_ROOTS], 2))
+        more = " ..." if len(x_roots) > LISTED_ROOTS else ""
+        count = f"at least {len(x_roots)}" if truncated else len(x_roots)
+        answer = f"x = {listed}{more} ({count} solutions in [{x_from}, {x_to}])"
+    return equation_figure(f, c, window, x_roots), f"{text} = {c} =======> {answer}"
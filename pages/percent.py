@@ -1,6 +1,7 @@
 import dash
 from dash import dcc, html, Input, Output, callback
-import plotly.graph_objects as go
+
+from utils.figures import Figure, scatter
 
 dash.register_page(module = __name__, name = "Percent")
 
@@ -39,7 +40,7 @@ def draw_start_amount(n_decStart, n_incStart, n_decPercent, n_incPercent):
     n_end = n_start + change_amount
 
     # START BAR (top)
-    trace1 = go.Scatter(
+    trace1 = scatter(
         x=[0,0,n_start,n_start,0],
         y=[5,10,10,5,5],
         fill="toself",
@@ -49,7 +50,7 @@ def draw_start_amount(n_decStart, n_incStart, n_decPercent, n_incPercent):
     )
 
     # 🔥 Make dashed line visible: plotted *after* bar, slightly above it
-    trace_change_dash = go.Scatter(
+    trace_change_dash = scatter(
         x=[0, change_amount],
         y=[10.2, 10.2],                # subtle offset to make it visible
         mode="lines",
@@ -58,7 +59,7 @@ def draw_start_amount(n_decStart, n_incStart, n_decPercent, n_incPercent):
     )
 
     # END BAR (bottom)
-    trace2 = go.Scatter(
+    trace2 = scatter(
         x=[0,0,n_end,n_end,0],
         y=[-5,-10,-10,-5,-5],
         fill="toself",
@@ -68,7 +69,7 @@ def draw_start_amount(n_decStart, n_incStart, n_decPercent, n_incPercent):
     )
 
     # Connector dashed line — still visible but not in legend
-    trace3 = go.Scatter(
+    trace3 = scatter(
         x=[n_start, n_end],
         y=[0,0],
         mode="lines",
@@ -76,7 +77,7 @@ def draw_start_amount(n_decStart, n_incStart, n_decPercent, n_incPercent):
         line=dict(color="black", dash="dash")
     )
 
-    fig = go.Figure([trace1, trace2, trace_change_dash, trace3])
+    fig = Figure([trace1, trace2, trace_change_dash, trace3])
 
     # ===============================
     # X-AXIS CONFIG — now working
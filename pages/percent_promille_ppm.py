@@ -1,6 +1,7 @@
 import dash
 from dash import dcc, html, Input, Output, ctx, callback
-import plotly.graph_objects as go
+
+from utils.figures import Figure
 
 dash.register_page(module=__name__, name="Percent, promille, PPM Conversion")
 
@@ -46,7 +47,7 @@ def make_graph(unit, value):
     right_limit = max(1, fill_fraction)
 
     # ---- Create figure ----
-    fig = go.Figure()
+    fig = Figure()
 
     # Fill area (always below ticks)
     fig.add_shape(
@@ -1,9 +1,40 @@
+import os
+
 import dash
-from dash import dcc, html, Input, Output, callback
-import plotly.graph_objects as go
+from dash import dcc, html, Input, Output, State, callback, no_update
+from dash.exceptions import PreventUpdate
 import numpy as np
 
+from utils import integration
+from utils.figures import Figure, scatter, step_scatter
+
 dash.register_page(module = __name__, name = "Area and primitive function")
+
+# Sample points of an entered function, integrated at full resolution
+INTEGRATION_POINTS = [1000, 10_000, 100_000, 1_000_000]
+# Clicks the area graphs keep, older ones are dropped
+HISTORY_CLICKS = int(os.environ.get("MATHTUTOR_AREA_HISTORY", "500"))
+# Step of function A per click of the decrease, same and increase buttons
+AREA_STEPS = (-1, 0, 1)
+
+
+def primitive_figure():
+    """The primitive graph before the first click: area 0 at x = 0."""
+    fig = Figure(scatter(
+        x = [0], y = [0],
+    ), layout = {"title": "Primitive of function A", "title_x" : 0.5, "yaxis_title" : "Area of function A"})
+    return fig
+
+
+def derivative_figure():
+    """The function A graph before the first click, without a step."""
+    fig = Figure(scatter(
+        x = [], y = [],
+        fill = "tozeroy",
+    ), layout = {"title": "Function A", "title_x" : 0.5})
+    return fig
+
+
 layout = html.Div([
      html.H4('Area and primitive function', style={"font-size": "30px", "text-align": "center"}), 
      html.P("Explore how the area under a function can be determined by the value of its primitive function. By using the buttons the area under Function A can be increased, decreased or stay the same. Notice how the value of the primitive to function A reflects this, ecpecially notice that if the area under Function A stays the same the primitive of Function A is horizontal hence its derivitive (meaning Function A) is zero", style={"text-align": "center"}),
@@ -28,8 +59,10 @@ layout = html.Div([
 
         # RIGHT COLUMN — THE TWO GRAPHS STACKED VERTICALLY
         html.Div([
-            dcc.Graph(id="derivative_function", style={"height": "300px"}),
-            dcc.Graph(id="primitive_function", style={"height": "300px"}),
+            dcc.Graph(id="derivative_function", figure=derivative_figure(), style={"height": "300px"}),
+            dcc.Graph(id="primitive_function", figure=primitive_figure(), style={"height": "300px"}),
+            # Clicks of the decrease, same and increase buttons the graphs show
+            dcc.Store(id="area-drawn-clicks", data=[0, 0, 0]),
         ],
         style={
             "display": "flex",
@@ -44,52 +77,80 @@ layout = html.Div([
         "alignItems": "center"
     }), 
      html.P(id = "area_calculation_primitive_function"), 
-     dcc.Store(id = "prev_y_prim"),
+     html.H4('Primitive of a function you enter', style={"font-size": "30px", "text-align": "center"}),
+     html.P("Type a function f(x) and an interval. The area under f from the start of the interval up to x is the value of its primitive F at x; areas below the x axis count as negative. Use x, pi, e, + - * / ^ and sin, cos, tan, exp, log, sqrt, abs. Intervals where f goes to infinity and changes sign (1/x at 0) are rejected; f must not go to infinity without changing sign either (1/x^2 at 0), that is not detected", style={"text-align": "center"}),
+     html.Div([
+        html.P("f(x)"),
+        dcc.Input(id="entered-f", type="text", value="cos(x)", debounce=True, style={'width': '300px'}),
+        html.P("Interval (x from, to)"),
+        dcc.Input(id="entered-from", type="number", value=0, debounce=True),
+        dcc.Input(id="entered-to", type="number", value=6.28, debounce=True),
+        html.P("Points"),
+        dcc.Dropdown(id="entered-points", options=INTEGRATION_POINTS, value=100_000, clearable=False, style={'width': '140px'}),
+        dcc.RadioItems(id="entered-method", options=list(integration.METHODS), value="simpson", inline=True),
+     ]),
+     dcc.Graph(id="entered_function", style={"height": "300px"}),
+     dcc.Graph(id="entered_primitive", style={"height": "300px"}),
+     html.P(id = "entered_area"),
      html.P("Created by Christian Schwerdt", style={"font-style": "italic", "text-align": "right"}),
      ])
 
 
-@callback(Output("primitive_function", "figure"), Output("prev_y_prim", "data"), Input("prev_y_prim", "data"), Input("btn-decArea", "n_clicks"), Input("btn-sameArea", "n_clicks"), Input("btn-incArea", "n_clicks"))
-def draw_primitive_function(data, n_decArea, n_sameArea, n_incArea):
-    n = (n_incArea - n_decArea + 0*n_sameArea)
-    if not data:
-         y = [0]
-         x = [0]
-         x_axis_length = 1
-    else:
-        y = data + [n]
-        x = [x for x in range(len(y))]
-        x_axis_length = len(data) + 1
-    fig = go.Figure(go.Scatter(
-        x = x, y=y,
-    ), layout = {"title": "Primitive of function A", "title_x" : 0.5, "yaxis_title" : "Area of function A"})
-    fig.update_xaxes(range=[0, x_axis_length])
+def gap_steps(drawn, clicks):
+    """The steps of function A for the clicks after drawn, at most the last HISTORY_CLICKS.
+
+    drawn and clicks are the [decrease, same, increase] clicks the graphs show
+    and the buttons have. The browser does not tell in which order clicks it
+    sent together happened, they are drawn decreases first, then the same
+    area clicks, then increases.
+    """
+    missing = [now - before for before, now in zip(drawn, clicks)]
+    skip = max(0, sum(missing) - HISTORY_CLICKS)
+    for index, count in enumerate(missing):
+        dropped = min(count, skip)
+        missing[index] -= dropped
+        skip -= dropped
+    return np.repeat(AREA_STEPS, missing)
+
 
-    return fig, y
+# Every click appends its point to the primitive and its step to function A
+# with extendData, the history stays in the browser. The clicks already drawn
+# come back from the browser, so a response the browser drops or clicks it
+# sends in one request are drawn by the next request. Both graphs keep the
+# last HISTORY_CLICKS clicks.
+@callback(Output("primitive_function", "extendData"), Output("derivative_function", "extendData"), Output("area-drawn-clicks", "data"), Input("btn-decArea", "n_clicks"), Input("btn-sameArea", "n_clicks"), Input("btn-incArea", "n_clicks"), State("area-drawn-clicks", "data"), prevent_initial_call=True)
+def extend_history(n_decArea, n_sameArea, n_incArea, drawn):
+    clicks = [n_decArea, n_sameArea, n_incArea]
+    if any(now < before for before, now in zip(drawn, clicks)) or clicks == drawn:
+        raise PreventUpdate
+    steps = gap_steps(drawn, clicks)
+    total = sum(clicks)
+    start = total - len(steps)
+    # The area after the last click is known, the points before it follow the steps back
+    n = n_incArea - n_decArea
+    area = n - np.sum(steps) + np.cumsum(np.concatenate([[0], steps]))
+    # The point before the steps is drawn already, unless older clicks were skipped
+    first = 0 if start > sum(drawn) else 1
+    # Plain lists, extendData takes no typed arrays
+    primitive = [{"x": [list(range(start + first, total + 1))], "y": [area[first:].tolist()]}, [0], HISTORY_CLICKS + 1]
+    step = step_scatter(steps, start=start)
+    derivative = [{"x": [step["x"].tolist()], "y": [step["y"].tolist()]}, [0], 2 * HISTORY_CLICKS]
+    return primitive, derivative, clicks
 
-@callback(Output("derivative_function", "figure"), Input("prev_y_prim", "data"))
+
+# The whole function A graph for a history of primitive values, what the graph
+# shows after len(data) - 1 clicks, see scripts/check_primitive_history.py
 def draw_derivative_function(data):
     if not data or len(data) == 1:
-         y = [0]
-         x = [0]
-         x_axis_length = 1
-    elif len(data) == 2:
-        y_temp = np.diff(data)
-        y = np.append(y_temp, y_temp[-1])
-        x = [x for x in range(len(y))]
-        x_axis_length = len(data)
+        trace = scatter(
+            x = [0], y = [0],
+            fill = "tozeroy",
+        )
+        x_axis_length = 1
     else:
-        diffs = np.diff(data)
-        y = np.array([diffs[0], diffs[0]])
-        x = np.array([0, 1])
-        for index in range(len(diffs) - 1):
-             y = np.append(y, np.array([diffs[index + 1], diffs[index + 1]]))
-             x = np.append(x, np.array([index + 1, index + 2]))
+        trace = step_scatter(np.diff(data), fill = "tozeroy")
         x_axis_length = len(data)
-    fig = go.Figure(go.Scatter(
-        x = x, y = y,
-        fill = "tozeroy",
-    ), layout = {"title": "Function A", "title_x" : 0.5})
+    fig = Figure(trace, layout = {"title": "Function A", "title_x" : 0.5})
     fig.update_xaxes(range=[0, x_axis_length])
 
     return fig
@@ -98,4 +159,28 @@ def draw_derivative_function(data):
 @callback(Output("area_calculation_primitive_function", "children"), Input("btn-left", "n_clicks"), Input("btn-right", "n_clicks"))
 def area_formula(n_left, n_right):
         return "Area under derivative function equals primitive function"
-    
\ No newline at end of file
+    
+
+
+@callback(Output("entered_function", "figure"), Output("entered_primitive", "figure"), Output("entered_area", "children"), Input("entered-f", "value"), Input("entered-from", "value"), Input("entered-to", "value"), Input("entered-points", "value"), Input("entered-method", "value"))
+def draw_entered_primitive(text, start, stop, points, method):
+    if start is None or stop is None or not start < stop:
+        return no_update, no_update, "The interval must start before it ends"
+    if not isinstance(points, int) or points not in INTEGRATION_POINTS:
+        return no_update, no_update, f"Points must be one of {', '.join(map(str, INTEGRATION_POINTS))}"
+    try:
+        (x, y, primitive), area = integration.primitive(text, float(start), float(stop), points, method)
+    except ValueError as error:
+        return no_update, no_update, f"f(x) = {text}: {error}"
+
+    function_fig = Figure(scatter(
+        x = x, y = y,
+        fill = "tozeroy",
+    ), layout = {"title": f"f(x) = {text}", "title_x" : 0.5})
+    primitive_fig = Figure(scatter(
+        x = x, y = primitive,
+    ), layout = {"title": "Primitive F(x) of f", "title_x" : 0.5, "yaxis_title" : "Area under f"})
+    for fig in (function_fig, primitive_fig):
+        fig.update_xaxes(range=[start, stop])
+
+    return function_fig, primitive_fig, f"Area under f(x) = {text} from {start} to {stop}: F({stop}) = {np.round(area, 6)} ({method}, {points} points)"
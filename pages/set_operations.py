@@ -3,7 +3,12 @@ import dash
 from dash import html, dcc, Input, Output
 import dash_svg as svg
 
-dash.register_page(__name__, path="/set-theory", name="Set operations")
+dash.register_page(
+    __name__,
+    path="/set-theory",
+    name="Set operations",
+    description="Union, intersection, difference and symmetric difference of two sets in a Venn diagram",
+)
 
 # Colors
 COLOR_A = "#add8e6"     # light blue
@@ -1,7 +1,8 @@
 import numpy as np
 import dash
 from dash import html, dcc, Input, Output
-import plotly.graph_objects as go
+
+from utils.figures import Figure, scatter
 
 dash.register_page(__name__, path="/triangle-sum")
 
@@ -88,10 +89,10 @@ def make_triangle_figure(pts, outer_A, outer_B, outer_C):
     y = pts[:,1]
 
     extensions = compute_extensions(pts)
-    fig = go.Figure()
+    fig = Figure()
 
     # triangle edges
-    fig.add_trace(go.Scatter(
+    fig.add_trace(scatter(
         x=np.append(x,x[0]), y=np.append(y,y[0]),
         mode="lines+markers",
         marker=dict(size=10,color="blue"),
@@ -103,7 +104,7 @@ def make_triangle_figure(pts, outer_A, outer_B, outer_C):
     for i, (p1_orig, p2_orig) in enumerate(extensions):
         p1 = p1_orig + np.array([triangle_shift_x,0])
         p2 = p2_orig + np.array([triangle_shift_x,0])
-        fig.add_trace(go.Scatter(
+        fig.add_trace(scatter(
             x=[p1[0],p2[0]], y=[p1[1],p2[1]],
             mode="lines", line=dict(color="gray",dash="dash",width=2),
             showlegend=False
@@ -120,7 +121,7 @@ def make_triangle_figure(pts, outer_A, outer_B, outer_C):
 
         # inner arc
         ax, ay = make_angle_arc(vertex, v1, v2)
-        fig.add_trace(go.Scatter(
+        fig.add_trace(scatter(
             x=[vertex[0]]+list(ax)+[vertex[0]],
             y=[vertex[1]]+list(ay)+[vertex[1]],
             fill="toself",
@@ -145,7 +146,7 @@ def make_triangle_figure(pts, outer_A, outer_B, outer_C):
         ov1 = v2 if i==0 else -v1
         ov2 = -v1 if i==0 else v2
         ax2, ay2 = make_outer_arc(vertex, ov1, ov2, outward_dir)
-        fig.add_trace(go.Scatter(
+        fig.add_trace(scatter(
             x=[vertex[0]]+list(ax2)+[vertex[0]],
             y=[vertex[1]]+list(ay2)+[vertex[1]],
             fill="toself",
@@ -227,7 +228,7 @@ def make_triangle_figure(pts, outer_A, outer_B, outer_C):
         # Filled wedge
         wedge_x = [center_x] + list(center_x + radius * np.cos(theta)) + [center_x]
         wedge_y = [center_y] + list(center_y + radius * np.sin(theta)) + [center_y]
-        fig.add_trace(go.Scatter(
+        fig.add_trace(scatter(
             x=wedge_x, y=wedge_y,
             fill="toself", fillcolor=ANGLE_COLORS[label],
             line=dict(color="black", width=1), showlegend=False
@@ -238,9 +239,9 @@ def make_triangle_figure(pts, outer_A, outer_B, outer_C):
         ys1 = center_y + radius * np.sin(start)
         xe1 = center_x + radius * np.cos(end)
         ye1 = center_y + radius * np.sin(end)
-        fig.add_trace(go.Scatter(x=[center_x, xs1], y=[center_y, ys1],
+        fig.add_trace(scatter(x=[center_x, xs1], y=[center_y, ys1],
                                  mode="lines", line=dict(color="black", width=2), showlegend=False))
-        fig.add_trace(go.Scatter(x=[center_x, xe1], y=[center_y, ye1],
+        fig.add_trace(scatter(x=[center_x, xe1], y=[center_y, ye1],
                                  mode="lines", line=dict(color="black", width=2), showlegend=False))
 
         # Label just outside the wedge midpoint
@@ -342,7 +343,7 @@ layout = html.Div([
 def update_triangle(a_deg,b_deg):
     pts, c_deg = triangle_vertices(a_deg,b_deg)
     if pts is None:
-        return go.Figure()
+        return Figure()
     outer_A = 180 - a_deg
     outer_B = 180 - b_deg
     outer_C = 180 - c_deg
@@ -1,6 +1,7 @@
 import dash
 from dash import dcc, html, Input, Output, callback
-import plotly.graph_objects as go
+
+from utils.figures import Figure, scatter
 
 dash.register_page(module = __name__, name = "Triangle area")
 layout = html.Div([
@@ -28,10 +29,10 @@ layout = html.Div([
 @callback(Output("triangle", "figure"), Input("btn-left", "n_clicks"), Input("btn-right", "n_clicks"))
 def draw_triangle(n_left, n_right):
     n = 0.5*(n_right - n_left)
-    fig = go.Figure(go.Scatter(
+    fig = Figure(scatter(
         x = [1+n, 0, 2, 1+n, 1+n, 1+n], y=[2, 0, 0, 2, 0, 2],
         fill = "toself",
-        mode = "lines + text",
+        mode = "lines+text",
         text = ["A", "B", "D", "A", "C"],
         textfont = {"size":20},
     ), layout = {"title": "Triangle", "title_x" : 0.5})
@@ -51,10 +52,10 @@ def draw_triangle(n_left, n_right):
 @callback(Output("sub_triangle1", "figure"), Input("btn-left", "n_clicks"), Input("btn-right", "n_clicks"))
 def draw_sub_triangle1(n_left, n_right):
     n = 0.5*(n_right - n_left)
-    fig = go.Figure(go.Scatter(
+    fig = Figure(scatter(
         x = [1+n, 0, 1+n, 1+n], y=[2, 0, 0, 2],
         fill = "toself",
-        mode = "lines + text",
+        mode = "lines+text",
         text = ["A", "B", "C"],
         textfont = {"size":20},
     ), layout = {"title": "Triangle 1", "title_x" : 0.5})
@@ -74,10 +75,10 @@ def draw_sub_triangle1(n_left, n_right):
 @callback(Output("sub_triangle2", "figure"), Input("btn-left", "n_clicks"), Input("btn-right", "n_clicks"))
 def draw_sub_triangle2(n_left, n_right):
     n = 0.5*(n_right - n_left)
-    fig = go.Figure(go.Scatter(
+    fig = Figure(scatter(
         x = [1+n, 1+n, 2, 1+n], y=[2, 0, 0, 2],
         fill = "toself",
-        mode = "lines + text",
+        mode = "lines+text",
         text = ["A", "C", "D"],
         textfont = {"size":20},
     ), layout = {"title": "Triangle 2", "title_x" : 0.5})
@@ -1,63 +1,74 @@
 import dash
-from dash import dcc, html, Input, Output, callback
-import plotly.graph_objects as go
+from dash import dcc, html, ClientsideFunction, Input, Output, Patch, State, clientside_callback
 import numpy as np
 
-dash.register_page(module = __name__, name = "Find both angles for sin and cos in unity circle")
-
-layout = html.Div([
-    html.H4('Visualize both angles giving the same sin or cos value', style={"font-size": "30px", "text-align": "center"}),
-    html.P("Explore how two angles give the same sin or cos value respectively. These two angles are a subset of all possible values which can be explored more on the sinus equation page", style={"text-align": "center"}),
-    dcc.Graph(id="unity_circle2"),
-    html.P("Angle (v)"),
-    html.Button("-", n_clicks=0, id='btn-dec', style={'font-size': '18px', 'width': '140px', 'height':'30px'}),
-    html.Button("+", n_clicks=0, id='btn-inc', style={'font-size': '18px', 'width': '140px', 'height':'30px'}),
-    html.P("Created by Christian Schwerdt", style={"font-style": "italic", "text-align": "right"}),
-    ])
+from utils.figures import Figure, patch_items, scatter
 
+dash.register_page(module = __name__, name = "Find both angles for sin and cos in unity circle")
 
 
-@callback(Output("unity_circle2", "figure"), Input("btn-dec", "n_clicks"), Input("btn-inc", "n_clicks"))
-def draw_unity_circle(n_left, n_right):
-    n = 0.1 * (n_right - n_left)
+def unity_circle_traces(n):
+    """The radii to the three angles with the same sin or cos as angle n and the dashed lines between them."""
     x = np.cos(n)
     y = np.sin(n)
 
-    point = go.Scatter(
+    point = scatter(
         x=[0, x],
         y=[0, y],
     )
 
-    point_sin_2 = go.Scatter(
+    point_sin_2 = scatter(
         x=[0, -x],
         y=[0, y],
     )
 
-    point_cos_2 = go.Scatter(
+    point_cos_2 = scatter(
         x=[0, x],
         y=[0, -y],
     )
 
-    y_level = go.Scatter(
+    y_level = scatter(
         x = [-x, x],
         y = [y, y],
         line = {"dash":"dash"},
-        mode = "lines + text",
+        mode = "lines+text",
         text = [f"sin(v1) = sin(v2) = {np.round(np.sin(n), 2)}"],
         textposition = "top right" 
     )
 
-    x_level = go.Scatter(
+    x_level = scatter(
         x = [x, x],
         y = [-y, y],
         line = {"dash":"dash"},
-        mode = "lines + text",
+        mode = "lines+text",
         text = [f"cos(v1) = cos(v3) = {np.round(np.cos(n), 2)}"],
         textposition = "top right" 
     )
 
-    trace_data = [point, point_sin_2, point_cos_2, y_level, x_level]
-    fig = go.Figure(data=trace_data)
+    return [point, point_sin_2, point_cos_2, y_level, x_level]
+
+
+def unity_circle_annotations(n):
+    x = np.cos(n)
+    y = np.sin(n)
+    return [
+        dict(x = x/3, y = y/3,
+             text = f"v1 = {np.round(n, 2)}",
+             showarrow = False,
+             yshift = 0),
+        dict(x = -x/3, y = y/3,
+             text = f"v2 = {np.round(np.pi - n, 2)}",
+             showarrow = False,
+             yshift = 0),
+        dict(x = x/3, y = -y/3,
+             text = f"v3 = {np.round(-n, 2)}",
+             showarrow = False,
+             yshift = 0),
+    ]
+
+
+def unity_circle_figure(n):
+    fig = Figure(data=unity_circle_traces(n))
     
     fig.add_shape(type="circle",
     xref="x", yref="y",
@@ -68,17 +79,36 @@ def draw_unity_circle(n_left, n_right):
     fig.update_xaxes(range=[-1.7, 1.7])
     fig.update_yaxes(range=[-1.7, 1.7])
     fig.update_layout(autosize = False, width = 1000, height = 1000, showlegend=False, title =  "Unit circle", title_x = 0.5)
-    fig.add_annotation(x = x/3, y = y/3,
-                       text = f"v1 = {np.round(n, 2)}",
-                       showarrow = False,
-                       yshift = 0)
-    fig.add_annotation(x = -x/3, y = y/3,
-                       text = f"v2 = {np.round(np.pi - n, 2)}",
-                       showarrow = False,
-                       yshift = 0)
-    fig.add_annotation(x = x/3, y = -y/3,
-                       text = f"v3 = {np.round(-n, 2)}",
-                       showarrow = False,
-                       yshift = 0)
-
-    return fig
\ No newline at end of file
+    for annotation in unity_circle_annotations(n):
+        fig.add_annotation(**annotation)
+
+    return fig
+
+
+layout = html.Div([
+    html.H4('Visualize both angles giving the same sin or cos value', style={"font-size": "30px", "text-align": "center"}),
+    html.P("Explore how two angles give the same sin or cos value respectively. These two angles are a subset of all possible values which can be explored more on the sinus equation page", style={"text-align": "center"}),
+    dcc.Graph(id="unity_circle2", figure=unity_circle_figure(0.0)),
+    html.P("Angle (v)"),
+    html.Button("-", n_clicks=0, id='btn-dec', style={'font-size': '18px', 'width': '140px', 'height':'30px'}),
+    html.Button("+", n_clicks=0, id='btn-inc', style={'font-size': '18px', 'width': '140px', 'height':'30px'}),
+    html.P("Created by Christian Schwerdt", style={"font-style": "italic", "text-align": "right"}),
+    ])
+
+
+# The graph starts at angle 0, the angle buttons move what depends on the
+# angle in the browser (assets/unit_circle.js). draw_unity_circle is the
+# reference for the JS function, see scripts/check_unit_circle_parity.py.
+clientside_callback(
+    ClientsideFunction(namespace="unit_circle", function_name="both_angles"),
+    Output("unity_circle2", "figure"), Input("btn-dec", "n_clicks"), Input("btn-inc", "n_clicks"), State("unity_circle2", "figure"),
+    prevent_initial_call=True,
+)
+
+
+def draw_unity_circle(n_left, n_right):
+    n = 0.1 * (n_right - n_left)
+    fig = Patch()
+    patch_items(fig["data"], unity_circle_traces(n))
+    patch_items(fig["layout"]["annotations"], unity_circle_annotations(n))
+    return fig
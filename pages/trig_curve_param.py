@@ -1,8 +1,10 @@
 import dash
-from dash import dcc, html, Input, Output, callback
-import plotly.graph_objects as go
+from dash import dcc, html, Input, Output, callback, no_update
 import numpy as np
 
+from utils import sine
+from utils.figures import Figure, scatter
+
 dash.register_page(module = __name__, name = "Sinus function parameters")
 
 layout = html.Div([
@@ -35,86 +37,77 @@ layout = html.Div([
     ])
 
 
-@callback(Output("sin_curve", "figure"), Input("btn-decPhase", "n_clicks"), Input("btn-incPhase", "n_clicks"), Input("btn-decAmp", "n_clicks"), Input("btn-incAmp", "n_clicks"), Input("btn-decFreq", "n_clicks"), Input("btn-incFreq", "n_clicks"), Input("btn-decCenter", "n_clicks"), Input("btn-incCenter", "n_clicks"))
-def draw_sin_curve(n_decPhase, n_incPhase, n_decAmp, n_incAmp, n_decFreq, n_incFreq, n_decCenter, n_incCenter):
+def sin_parameters(n_decPhase, n_incPhase, n_decAmp, n_incAmp, n_decFreq, n_incFreq, n_decCenter, n_incCenter):
+    """Phase, amplitude, frequency and center of the sinus function from the button clicks."""
     n_phase = 0.1 * (n_incPhase - n_decPhase)
     n_amp = 1 + (n_incAmp - n_decAmp)
     n_freq = 1 + (n_incFreq - n_decFreq)
     n_center = (n_incCenter - n_decCenter)
-    x = np.linspace(-2*np.pi, 2*np.pi, 1000)
-    y = n_amp * np.sin(n_freq*x + n_phase) + n_center
+    return n_phase, n_amp, n_freq, n_center
+
 
-    trace1 = go.Scatter(
+def sin_curve_figure(n_phase, n_amp, n_freq, n_center):
+    x, y = sine.curve(n_amp, n_freq, n_phase, n_center, (-2*np.pi, 2*np.pi), 1000)
+
+    trace1 = scatter(
         x=x,
         y=y,
         mode='lines',
     )
 
     trace_data = [trace1]
-    fig = go.Figure(data=trace_data)
+    fig = Figure(data=trace_data)
     fig.update_layout(showlegend=False)
     fig.update_yaxes(range=[n_center - abs(n_amp) - 1, n_center + abs(n_amp) + 1])
 
     return fig
 
-@callback(Output("sin_curve_2", "figure"), Input("btn-decPhase", "n_clicks"), Input("btn-incPhase", "n_clicks"), Input("btn-decAmp", "n_clicks"), Input("btn-incAmp", "n_clicks"), Input("btn-decFreq", "n_clicks"), Input("btn-incFreq", "n_clicks"), Input("btn-decCenter", "n_clicks"), Input("btn-incCenter", "n_clicks"))
-def draw_sin_curve(n_decPhase, n_incPhase, n_decAmp, n_incAmp, n_decFreq, n_incFreq, n_decCenter, n_incCenter):
-    n_phase = 0.1 * (n_incPhase - n_decPhase)
-    n_amp = 1 + (n_incAmp - n_decAmp)
-    n_freq = 1 + (n_incFreq - n_decFreq)
-    n_center = (n_incCenter - n_decCenter)
-    x = np.linspace(- 2*np.pi/n_freq, 2*np.pi/n_freq, 1000)
-    y = n_amp * np.sin(n_freq*x + n_phase) + n_center
-    B = 1 + (n_incFreq - n_decFreq)
-    C = 0.1 * (n_incPhase - n_decPhase) / B
 
-    trace1 = go.Scatter(
+def period_figure(n_phase, n_amp, n_freq, n_center):
+    """One period of the sinus function with the phase shift and the period T marked."""
+    x, y = sine.curve(n_amp, n_freq, n_phase, n_center, (- 2*np.pi/n_freq, 2*np.pi/n_freq), 1000)
+    B = n_freq
+    C = n_phase / B
+
+    trace1 = scatter(
         x=x,
         y=y,
         mode='lines',
+        name="sinus function",
     )
 
-    trace2 = go.Scatter(
+    trace2 = scatter(
         x=[0, -C],
         y=[n_center, n_center],
+        name="phase shift",
     )
 
-    trace3 = go.Scatter(
+    trace3 = scatter(
         x=[0, 2*np.pi/B],
         y=[n_amp * np.sin(n_freq*0 + n_phase) + n_center, n_amp * np.sin(n_freq*2*np.pi/B + n_phase) + n_center],
+        name="Period (T)",
     )
 
     trace_data = [trace1, trace2, trace3]
-    fig = go.Figure(data=trace_data)
-    fig["data"][0]["name"] = "sinus function"
-    fig["data"][1]["name"] = "phase shift"
-    fig["data"][2]["name"] = "Period (T)"
+    fig = Figure(data=trace_data)
     fig.update_layout(showlegend=True)
     fig.update_yaxes(range=[n_center - abs(n_amp) - 1, n_center + abs(n_amp) + 1])
 
     return fig
 
 
-@callback(Output("sin_parameters", "children"), Input("btn-decPhase", "n_clicks"), Input("btn-incPhase", "n_clicks"), Input("btn-decAmp", "n_clicks"), Input("btn-incAmp", "n_clicks"), Input("btn-decFreq", "n_clicks"), Input("btn-incFreq", "n_clicks"), Input("btn-decCenter", "n_clicks"), Input("btn-incCenter", "n_clicks"))
-def area_formula(n_decPhase, n_incPhase, n_decAmp, n_incAmp, n_decFreq, n_incFreq, n_decCenter, n_incCenter):
-    n_phase = 0.1 * (n_incPhase - n_decPhase)
-    n_amp = 1 + (n_incAmp - n_decAmp)
-    n_freq = 1 + (n_incFreq - n_decFreq)
-    n_center = (n_incCenter - n_decCenter)
-    return f"Phase: {n_phase} and Amplitude: {n_amp} and Frequency: {n_freq} and Center: {n_center}" 
-
-@callback(Output("sin_equation", "children"), Input("btn-decPhase", "n_clicks"), Input("btn-incPhase", "n_clicks"), Input("btn-decAmp", "n_clicks"), Input("btn-incAmp", "n_clicks"), Input("btn-decFreq", "n_clicks"), Input("btn-incFreq", "n_clicks"), Input("btn-decCenter", "n_clicks"), Input("btn-incCenter", "n_clicks"))
-def area_formula(n_decPhase, n_incPhase, n_decAmp, n_incAmp, n_decFreq, n_incFreq, n_decCenter, n_incCenter):
-    n_phase = 0.1 * (n_incPhase - n_decPhase)
-    n_amp = 1 + (n_incAmp - n_decAmp)
-    n_freq = 1 + (n_incFreq - n_decFreq)
-    n_center = (n_incCenter - n_decCenter)
-    return f"y = {n_amp} * sin({n_freq} * x + {n_phase}) + {n_center}"
-
-@callback(Output("sin_equation_2", "children"), Input("btn-decPhase", "n_clicks"), Input("btn-incPhase", "n_clicks"), Input("btn-decAmp", "n_clicks"), Input("btn-incAmp", "n_clicks"), Input("btn-decFreq", "n_clicks"), Input("btn-incFreq", "n_clicks"), Input("btn-decCenter", "n_clicks"), Input("btn-incCenter", "n_clicks"))
-def area_formula(n_decPhase, n_incPhase, n_decAmp, n_incAmp, n_decFreq, n_incFreq, n_decCenter, n_incCenter):
-    n_amp = 1 + (n_incAmp - n_decAmp)
-    B = 1 + (n_incFreq - n_decFreq)
-    C = 0.1 * (n_incPhase - n_decPhase) / B
-    n_center = (n_incCenter - n_decCenter)
-    return f"y = A * sin(B(x + C)) + M = {n_amp} * sin({B} * (x + {C}) + {n_center}"
+# One request per click: the parameters are derived once and all five outputs
+# are built from them. At frequency 0 there is no period, the bottom graph
+# and its equation keep what they showed.
+@callback(Output("sin_curve", "figure"), Output("sin_curve_2", "figure"), Output("sin_parameters", "children"), Output("sin_equation", "children"), Output("sin_equation_2", "children"), Input("btn-decPhase", "n_clicks"), Input("btn-incPhase", "n_clicks"), Input("btn-decAmp", "n_clicks"), Input("btn-incAmp", "n_clicks"), Input("btn-decFreq", "n_clicks"), Input("btn-incFreq", "n_clicks"), Input("btn-decCenter", "n_clicks"), Input("btn-incCenter", "n_clicks"))
+def draw_sin_curve(n_decPhase, n_incPhase, n_decAmp, n_incAmp, n_decFreq, n_incFreq, n_decCenter, n_incCenter):
+    n_phase, n_amp, n_freq, n_center = sin_parameters(n_decPhase, n_incPhase, n_decAmp, n_incAmp, n_decFreq, n_incFreq, n_decCenter, n_incCenter)
+    parameters = f"Phase: {n_phase} and Amplitude: {n_amp} and Frequency: {n_freq} and Center: {n_center}"
+    equation = f"y = {n_amp} * sin({n_freq} * x + {n_phase}) + {n_center}"
+    if n_freq == 0:
+        return sin_curve_figure(n_phase, n_amp, n_freq, n_center), no_update, parameters, equation, no_update
+
+    C = n_phase / n_freq
+    equation_2 = f"y = A * sin(B(x + C)) + M = {n_amp} * sin({n_freq} * (x + {C}) + {n_center}"
+    return (sin_curve_figure(n_phase, n_amp, n_freq, n_center), period_figure(n_phase, n_amp, n_freq, n_center),
+            parameters, equation, equation_2)
@@ -1,94 +1,93 @@
+import functools
+import json
+
 import dash
-from dash import dcc, html, Input, Output, callback
-import plotly.graph_objects as go
+from dash import dcc, html, callback, ClientsideFunction, Input, Output, Patch, State, clientside_callback
+from dash.exceptions import PreventUpdate
 import numpy as np
 
-dash.register_page(module = __name__, name = "Connection between sinus function graph and unit circle")
-
-layout = html.Div([
-    html.H4('Sinus curve vs. unit circle visualization', style={"font-size": "30px", "text-align": "center"}),
-    html.P("Explore how the graph of the sinus function is connected with the unit circle by changing the angle (v) measured in radians. Explore how the y value on the y axis is alternating between -1 and 1 in both the sinus function graph and unity circle when increasing the angle (v)", style={"text-align": "center"}),
-    dcc.Graph(id="sin_curve_unity"),
-    html.Div([
-        dcc.Graph(id="unity_circle"),
-        html.Div([
-            html.P("Angle (v)"),
-            html.Button("-", n_clicks=0, id='btn-dec', style={'font-size': '18px', 'width': '140px', 'height':'30px'}),
-            html.Button("+", n_clicks=0, id='btn-inc', style={'font-size': '18px', 'width': '140px', 'height':'30px'}),
-        ])
-    ], 
-    style={
-        "display":"flex",
-        "flexDirection":"row"}
-    ),
-    html.P("Created by Christian Schwerdt", style={"font-style": "italic", "text-align": "right"}),
-    ])
+from utils import sine
+from utils.figures import Figure, patch_items, scatter
 
+dash.register_page(module = __name__, name = "Connection between sinus function graph and unit circle")
 
-@callback(Output("sin_curve_unity", "figure"), Input("btn-dec", "n_clicks"), Input("btn-inc", "n_clicks"))
-def draw_sin_curve(n_left, n_right):
-    n = 0.1 * (n_right - n_left)
-    x = np.linspace(-2*np.pi, 2*np.pi, 100)
-    y = np.sin(x)
 
-    point = go.Scatter(
-        x=x,
-        y=y,
-        mode='lines',
-    )
-
-    y_level = go.Scatter(
+def angle_traces(n):
+    """The point on the sinus graph at angle n and the dashed lines to it."""
+    y_level = scatter(
         x = [n],
         y = [np.sin(n)] 
     )
 
-    x_level = go.Scatter(
+    x_level = scatter(
         x = [0, n],
         y = [np.sin(n), np.sin(n)],
         line = {"dash":"dash"},
-        mode = "lines + text",
+        mode = "lines+text",
         text = [f"sin(v) = {np.round(np.sin(n), 2)}"],
         textposition = "top right" 
     )
 
-    sin_curve = go.Scatter(
+    sin_curve = scatter(
         x = [n, n],
         y = [0, np.sin(n)],
         line = {"dash":"dash"},
-        mode = "lines + text",
+        mode = "lines+text",
         text = [f"v = {np.round(n,2)}"],
         textposition = "bottom right" 
     )
 
-    trace_data = [point, y_level, x_level, sin_curve]
-    fig = go.Figure(data=trace_data)
+    return [y_level, x_level, sin_curve]
+
+
+def sin_curve_figure(n):
+    x, y = sine.curve(1, 1, 0, 0, (-2*np.pi, 2*np.pi), 100)
+
+    point = scatter(
+        x=x,
+        y=y,
+        mode='lines',
+    )
+
+    trace_data = [point] + angle_traces(n)
+    fig = Figure(data=trace_data)
     fig.update_layout(showlegend=False, title =  "Sinus function graph", title_x = 0.5, xaxis_title="angle (v)", yaxis_title="sin(v)")
     fig.update_traces (marker_size = 12)
 
     return fig
 
-@callback(Output("unity_circle", "figure"), Input("btn-dec", "n_clicks"), Input("btn-inc", "n_clicks"))
-def draw_unity_circle(n_left, n_right):
-    n = 0.1 * (n_right - n_left)
+
+def unity_circle_traces(n):
+    """The radius to angle n and the dashed line at its height."""
     x = np.cos(n)
     y = np.sin(n)
 
-    point = go.Scatter(
+    point = scatter(
         x=[0, x],
         y=[0, y],
     )
 
-    y_level = go.Scatter(
+    y_level = scatter(
         x = [0, x],
         y = [y, y],
         line = {"dash":"dash"},
-        mode = "lines + text",
+        mode = "lines+text",
         text = [f"sin(v) = {np.round(np.sin(n), 2)}"],
         textposition = "top right" 
     )
 
-    trace_data = [point, y_level]
-    fig = go.Figure(data=trace_data)
+    return [point, y_level]
+
+
+def unity_circle_annotation(n):
+    return dict(x = np.cos(n)/3, y = np.sin(n)/3,
+                text = f"v = {np.round(n, 2)}",
+                showarrow = False,
+                yshift = 0)
+
+
+def unity_circle_figure(n):
+    fig = Figure(data=unity_circle_traces(n))
     
     fig.add_shape(type="circle",
     xref="x", yref="y",
@@ -99,9 +98,136 @@ def draw_unity_circle(n_left, n_right):
     fig.update_xaxes(range=[-1.5, 1.5])
     fig.update_yaxes(range=[-1.5, 1.5])
     fig.update_layout(autosize = False, width = 500, height = 500, showlegend=False, title =  "Unit circle", title_x = 0.5)
-    fig.add_annotation(x = x/3, y = y/3,
-                       text = f"v = {np.round(n, 2)}",
-                       showarrow = False,
-                       yshift = 0)
+    fig.add_annotation(**unity_circle_annotation(n))
+
+    return fig
+
+
+# Step sizes in radians to play a full turn with
+SWEEP_STEPS = [0.05, 0.1, 0.2]
+SWEEP_FRAME_MS = 80
+
 
+def sweep_figure(step):
+    """The sinus graph and the unit circle side by side, with a frame per step from 0 to 2 pi.
+
+    The browser plays the frames without a request per step.
+    """
+    angles = np.linspace(0, 2*np.pi, int(round(2*np.pi / step)) + 1)
+    v, sin, cos = angles.tolist(), np.sin(angles).tolist(), np.cos(angles).tolist()
+    v_text = [f"v = {value}" for value in np.round(angles, 2).tolist()]
+    sin_text = [f"sin(v) = {value}" for value in np.round(np.sin(angles), 2).tolist()]
+
+    def moving_traces(i):
+        """x, y and text of angle_traces(v[i]) and unity_circle_traces(v[i])."""
+        return [
+            {"x": [v[i]], "y": [sin[i]]},
+            {"x": [0, v[i]], "y": [sin[i], sin[i]], "text": [sin_text[i]]},
+            {"x": [v[i], v[i]], "y": [0, sin[i]], "text": [v_text[i]]},
+            {"x": [0, cos[i]], "y": [0, sin[i]]},
+            {"x": [0, cos[i]], "y": [sin[i], sin[i]], "text": [sin_text[i]]},
+        ]
+
+    def annotations(i):
+        return [dict(x = cos[i]/3, y = sin[i]/3, xref = "x2", yref = "y2", text = v_text[i], showarrow = False)]
+
+    circle = [dict(trace, xaxis="x2", yaxis="y2") for trace in unity_circle_traces(0.0)]
+    fig = Figure(data=sin_curve_figure(0.0).data + circle)
+    fig.frames = [{"name": str(i), "data": moving_traces(i), "traces": [1, 2, 3, 4, 5],
+                   "layout": {"annotations": annotations(i)}} for i in range(len(v))]
+
+    fig.add_shape(type="circle",
+    xref="x2", yref="y2",
+    x0=-1, y0=-1, x1=1, y1=1,
+    line_color="LightSeaGreen",
+    )
+
+    frame = {"duration": SWEEP_FRAME_MS, "redraw": True}
+    still = {"frame": {"duration": 0, "redraw": True}, "mode": "immediate", "transition": {"duration": 0}}
+    fig.update_layout(
+        height = 500, showlegend=False, title = "Sinus function graph and unit circle", title_x = 0.5,
+        annotations = annotations(0),
+        xaxis = dict(domain=[0, 0.6], title="angle (v)"),
+        yaxis = dict(title="sin(v)"),
+        xaxis2 = dict(domain=[0.68, 1], range=[-1.5, 1.5]),
+        yaxis2 = dict(anchor="x2", range=[-1.5, 1.5], scaleanchor="x2"),
+        updatemenus = [dict(type="buttons", direction="left", x=0, y=-0.25, xanchor="left", yanchor="top", showactive=False, buttons=[
+            dict(label="Play", method="animate", args=[None, {"frame": frame, "fromcurrent": True, "transition": {"duration": 0}}]),
+            dict(label="Pause", method="animate", args=[[None], still]),
+        ])],
+        sliders = [dict(active=0, x=0.15, y=-0.15, len=0.85, currentvalue={"prefix": "v = "}, steps=[
+            dict(label=f"{value:.2f}", method="animate", args=[[str(i)], still]) for i, value in enumerate(v)
+        ])],
+    )
+
+    return fig
+
+
+@functools.lru_cache(maxsize=len(SWEEP_STEPS))
+def sweep_json(step):
+    """sweep_figure(step) encoded once per step size, as a string no caller can change."""
+    return json.dumps(sweep_figure(step).to_dict())
+
+
+layout = html.Div([
+    html.H4('Sinus curve vs. unit circle visualization', style={"font-size": "30px", "text-align": "center"}),
+    html.P("Explore how the graph of the sinus function is connected with the unit circle by changing the angle (v) measured in radians. Explore how the y value on the y axis is alternating between -1 and 1 in both the sinus function graph and unity circle when increasing the angle (v)", style={"text-align": "center"}),
+    dcc.Graph(id="sin_curve_unity", figure=sin_curve_figure(0.0)),
+    html.Div([
+        dcc.Graph(id="unity_circle", figure=unity_circle_figure(0.0)),
+        html.Div([
+            html.P("Angle (v)"),
+            html.Button("-", n_clicks=0, id='btn-dec', style={'font-size': '18px', 'width': '140px', 'height':'30px'}),
+            html.Button("+", n_clicks=0, id='btn-inc', style={'font-size': '18px', 'width': '140px', 'height':'30px'}),
+        ])
+    ], 
+    style={
+        "display":"flex",
+        "flexDirection":"row"}
+    ),
+    html.Div([
+        html.P("Play a full turn, step (v)"),
+        dcc.Dropdown(id="sweep-step", options=[{"label": f"{step} rad", "value": step} for step in SWEEP_STEPS],
+                     value=0.1, clearable=False, style={'width': '140px'}),
+    ]),
+    dcc.Graph(id="unit_circle_sweep"),
+    html.P("Created by Christian Schwerdt", style={"font-style": "italic", "text-align": "right"}),
+    ])
+
+
+# The graphs start at angle 0, the angle buttons move what depends on the
+# angle in the browser (assets/unit_circle.js). draw_sin_curve and
+# draw_unity_circle are the reference for the JS functions, see
+# scripts/check_unit_circle_parity.py.
+clientside_callback(
+    ClientsideFunction(namespace="unit_circle", function_name="sin_curve"),
+    Output("sin_curve_unity", "figure"), Input("btn-dec", "n_clicks"), Input("btn-inc", "n_clicks"), State("sin_curve_unity", "figure"),
+    prevent_initial_call=True,
+)
+clientside_callback(
+    ClientsideFunction(namespace="unit_circle", function_name="unity_circle"),
+    Output("unity_circle", "figure"), Input("btn-dec", "n_clicks"), Input("btn-inc", "n_clicks"), State("unity_circle", "figure"),
+    prevent_initial_call=True,
+)
+
+
+@callback(Output("unit_circle_sweep", "figure"), Input("sweep-step", "value"))
+def draw_sweep(step):
+    if step not in SWEEP_STEPS:
+        raise PreventUpdate
+    # A new dict per request; decoding is cheaper than building and encoding the figure again
+    return json.loads(sweep_json(step))
+
+
+def draw_sin_curve(n_left, n_right):
+    n = 0.1 * (n_right - n_left)
+    fig = Patch()
+    patch_items(fig["data"], angle_traces(n), start=1)
+    return fig
+
+def draw_unity_circle(n_left, n_right):
+    n = 0.1 * (n_right - n_left)
+    fig = Patch()
+    patch_items(fig["data"], unity_circle_traces(n))
+    patch_items(fig["layout"]["annotations"], [unity_circle_annotation(n)])
     return fig
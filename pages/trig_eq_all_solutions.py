@@ -1,10 +1,23 @@
 import dash
 from dash import dcc, html, Input, Output, callback
-import plotly.graph_objects as go
 import numpy as np
 
+from utils import sine
+from utils.figures import Figure, scatter
+
 dash.register_page(module = __name__, name = "Sinus equation solutions")
 
+# The part of the x axis the graph shows
+WINDOW = (- 2*2*np.pi, 2*2*np.pi)
+
+
+def found_solution(n_amp, n_freq, n_phase, n_center, y_const):
+    """The solution x = (arcsin((y - M) / A) - C) / B, or None if there is no single one."""
+    if n_amp == 0 or n_freq == 0 or abs(y_const - n_center) > abs(n_amp):
+        return None
+    return (np.arcsin((y_const - n_center)/n_amp) - n_phase) / n_freq
+
+
 layout = html.Div([
     html.H4('Sinus equation solutions', style={"font-size": "30px", "text-align": "center"}),
     html.P("Explore how all solutions to a sinus equation can be visualized be finding all the intersections between the horizontal line and the sinus function graph", style={"text-align": "center"}),
@@ -40,52 +53,49 @@ def draw_sin_curve(n_decY, n_incY, n_decPhase, n_incPhase, n_decAmp, n_incAmp, n
     n_amp = 1 + (n_incAmp - n_decAmp)
     n_freq = 1 + (n_incFreq - n_decFreq)
     n_center = (n_incCenter - n_decCenter)
-    x = np.linspace(- 2*2*np.pi, 2*2*np.pi, 1000)
-    y = n_amp * np.sin(n_freq*x + n_phase) + n_center
     y_const = n_incY - n_decY
-    B = 1 + (n_incFreq - n_decFreq)
-    x_solution = (np.arcsin((y_const - n_center)/n_amp) - n_phase) / n_freq
-    x_solution_2 = (np.pi - np.arcsin((y_const - n_center)/n_amp) - n_phase) / n_freq
+    x, y = sine.curve(n_amp, n_freq, n_phase, n_center, WINDOW, sine.resolution(n_freq, WINDOW))
+    x2, x3 = sine.solve(n_amp, n_freq, n_phase, n_center, y_const, WINDOW)
+    x_solution = found_solution(n_amp, n_freq, n_phase, n_center, y_const)
 
-    trace1 = go.Scatter(
+    trace1 = scatter(
         x=x,
         y=y,
         mode='lines',
+        name="sinus function",
     )
 
-    x2 = [x_solution + 2 * np.pi / B * (n-5) for n in range(10)]
-    y2 = [y_const for n in range(10)] 
-    trace2 = go.Scatter(
+    trace2 = scatter(
         x = x2,
-        y=y2,
+        y = np.full(len(x2), y_const),
+        name = f"x + n * 2 * pi / {n_freq}",
     )
 
-    x3 = [x_solution_2 + 2 * np.pi / B * (n-5) for n in range(10)]
-    y3 = [y_const for n in range(10)] 
-    trace3 = go.Scatter(
+    trace3 = scatter(
         x = x3,
-        y=y3,
+        y = np.full(len(x3), y_const),
+        name = f"pi - x + n * pi / {n_freq}",
     )
 
-    trace4 = go.Scatter(
-        x = [x_solution, x_solution],
-        y = [0, n_amp * np.sin(n_freq*x_solution + n_phase) + n_center],
-        line = {"dash":"dash"},
-        mode = "lines + text",
-        text = [f"x = {np.round(x_solution, 2)}"],
-        textposition = "bottom right"
-    )
+    if x_solution is None:
+        trace4 = scatter(x = [], y = [], name = "found solution")
+    else:
+        trace4 = scatter(
+            x = [x_solution, x_solution],
+            y = [0, n_amp * np.sin(n_freq*x_solution + n_phase) + n_center],
+            line = {"dash":"dash"},
+            mode = "lines+text",
+            text = [f"x = {np.round(x_solution, 2)}"],
+            textposition = "bottom right",
+            name = "found solution",
+        )
 
     trace_data = [trace1, trace2, trace3, trace4]
-    fig = go.Figure(data=trace_data)
-    fig["data"][0]["name"] = "sinus function"
-    fig["data"][1]["name"] = f"x + n * 2 * pi / {n_freq}"
-    fig["data"][2]["name"] = f"pi - x + n * pi / {n_freq}"
-    fig["data"][3]["name"] = "found solution"
+    fig = Figure(data=trace_data)
     fig.add_hline(y = y_const)
     fig.update_layout(showlegend=True)
     fig.update_yaxes(range=[n_center - abs(n_amp) - 1, n_center + abs(n_amp) + 1])
-    fig.update_xaxes(range=[- 2*2*np.pi, 2*2*np.pi])
+    fig.update_xaxes(range=list(WINDOW))
     fig.update_traces (marker_size = 12)
 
     return fig
@@ -97,5 +107,12 @@ def sin_equation_solution(n_decY, n_incY, n_decPhase, n_incPhase, n_decAmp, n_in
     n_freq = 1 + (n_incFreq - n_decFreq)
     n_center = (n_incCenter - n_decCenter)
     y_const = n_incY - n_decY
-    x_solution = (np.arcsin((y_const - n_center)/n_amp) - n_phase) / n_freq
-    return f"y = {n_amp} * sin({n_freq} * x + {n_phase}) + {n_center} = {y_const} =======> x = {np.round(x_solution, 2)}"
+    x_solution = found_solution(n_amp, n_freq, n_phase, n_center, y_const)
+    if x_solution is not None:
+        answer = f"x = {np.round(x_solution, 2)}"
+    elif (n_amp == 0 or n_freq == 0) and np.isclose(n_amp * np.sin(n_phase) + n_center, y_const):
+        # The curve is the horizontal line y = A * sin(C) + M
+        answer = "every x"
+    else:
+        answer = "no solution"
+    return f"y = {n_amp} * sin({n_freq} * x + {n_phase}) + {n_center} = {y_const} =======> {answer}"
@@ -0,0 +1,194 @@
+"""Benchmark every Dash callback without a browser, through the Flask test client.
+
+Usage: python scripts/benchmark_callbacks.py [--iterations N] [--filter TEXT]
+                                             [--save FILE] [--baseline FILE]
+
+Every server-side callback of every page is POSTed with the default input
+values of its page, followed by heavier scenarios a class produces: many
+clicks on the sine parameter buttons, the triangle sliders at their ends, a
+large multiplication grid, area buttons after 1000 clicks and large sets.
+
+Reported per scenario:
+
+- p50/p95/p99 latency in ms of the whole POST (parsing, callback, JSON),
+- alloc KB: peak memory allocated while handling one request, measured in a
+  separate tracemalloc run so it does not slow down the timed runs,
+- response size in bytes (uncompressed).
+
+--save writes the results as JSON. --baseline compares the run against such a
+file and exits with status 1 if a scenario got slower, bigger or allocates
+more than the thresholds allow (see --latency-threshold and friends). Only
+p50 is compared, p95/p99 vary too much between runs of the same code.
+Latency regressions smaller than --min-ms are ignored as noise.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import dash
+import numpy
+import plotly
+
+from callback_client import MAIN_CALLBACKS, CallbackClient, split_output
+
+import app  # pylint: disable=wrong-import-order
+
+# (page, output, input values, triggering input, label)
+HEAVY_SCENARIOS = [
+    ("/trig-curve-param",
+     "..sin_curve.figure...sin_curve_2.figure...sin_parameters.children"
+     "...sin_equation.children...sin_equation_2.children..",
+     {"btn-incFreq.n_clicks": 40, "btn-incAmp.n_clicks": 25, "btn-incPhase.n_clicks": 50,
+      "btn-incCenter.n_clicks": 10}, "btn-incPhase.n_clicks", "many clicks"),
+    ("/triangle-sum", "triangle-graph.figure", {"angle-a.value": 130, "angle-b.value": 20},
+     "angle-a.value", "a=130 b=20"),
+    ("/triangle-sum", "triangle-graph.figure", {"angle-a.value": 20, "angle-b.value": 130},
+     "angle-b.value", "a=20 b=130"),
+    ("/multiplacation-commutative",
+     "..top-grid-row.children...bottom-grid-row.children...equality-label.children..",
+     {"input-rows.value": 50, "input-cols.value": 50}, "input-cols.value", "50x50"),
+    ("/primitive-area",
+     "..primitive_function.extendData...derivative_function.extendData...area-drawn-clicks.data..",
+     {"btn-incArea.n_clicks": 600, "btn-decArea.n_clicks": 300, "btn-sameArea.n_clicks": 100,
+      "area-drawn-clicks.data": [300, 100, 599]},
+     "btn-incArea.n_clicks", "1000 clicks"),
+    ("/set-theory", "..A_only.children...B_only.children...A_and_B.children..",
+     {"input-set-a.value": ",".join(map(str, range(0, 3000, 2))),
+      "input-set-b.value": ",".join(map(str, range(0, 3000, 3)))}, "input-set-a.value", "1500+1000 items"),
+]
+
+
+def page_of(output):
+    """Path of the page whose module registered the callback of output."""
+    func = app.app.callback_map[output]["callback"]
+    module = getattr(func, "__wrapped__", func).__module__
+    page = dash.page_registry.get(module)
+    return page["path"] if page else "/"
+
+
+def scenarios(client):
+    """Return [(name, page, output, values, triggered)] covering every callback."""
+    main = {output: (page, values, triggered) for page, output, values, triggered in MAIN_CALLBACKS}
+    result = []
+    for output, dep in client.dependencies.items():
+        if output in main:
+            page, values, triggered = main[output]
+        else:
+            page, values = page_of(output), {}
+            first = dep["inputs"][0]
+            triggered = f"{first['id']}.{first['property']}"
+        result.append((f"{page} {split_output(output)[0][0]}", page, output, values, triggered))
+    for page, output, values, triggered, label in HEAVY_SCENARIOS:
+        result.append((f"{page} {split_output(output)[0][0]} ({label})", page, output, values, triggered))
+    return result
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def measure(client, page, output, values, triggered, iterations, warmup):
+    body = client.body(output, values, triggered)
+    headers = {"Referer": "http://localhost" + page}
+
+    def post():
+        return client.client.post("/_dash-update-component", json=body, headers=headers)
+
+    for _ in range(warmup):
+        post()
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        post()
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    baseline, _ = tracemalloc.get_traced_memory()
+    response = post()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "status": response.status_code,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "alloc_kb": (peak - baseline) / 1024,
+        "response_bytes": len(response.data),
+    }
+
+
+def compare(results, baseline, args):
+    """Return [(scenario, message)] of regressions against a baseline run."""
+    regressions = []
+    for name, new in results.items():
+        old = baseline.get(name)
+        if old is None:
+            continue
+        # The tail is dominated by garbage collections, only the median is stable enough to gate on
+        if new["p50_ms"] > old["p50_ms"] * (1 + args.latency_threshold) and new["p50_ms"] - old["p50_ms"] > args.min_ms:
+            regressions.append((name, f"p50 {old['p50_ms']:.2f} -> {new['p50_ms']:.2f} ms"))
+        if new["response_bytes"] > old["response_bytes"] * (1 + args.size_threshold):
+            regressions.append((name, f"response {old['response_bytes']} -> {new['response_bytes']} B"))
+        if new["alloc_kb"] > old["alloc_kb"] * (1 + args.alloc_threshold) + 16:
+            regressions.append((name, f"alloc {old['alloc_kb']:.0f} -> {new['alloc_kb']:.0f} KB"))
+        if new["status"] != old["status"]:
+            regressions.append((name, f"status {old['status']} -> {new['status']}"))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--filter", default="", help="only run scenarios whose name contains this text")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare against results saved with --save")
+    parser.add_argument("--latency-threshold", type=float, default=0.25, help="allowed relative p50 increase")
+    parser.add_argument("--min-ms", type=float, default=0.5, help="ignore latency increases below this")
+    parser.add_argument("--size-threshold", type=float, default=0.05, help="allowed relative response size increase")
+    parser.add_argument("--alloc-threshold", type=float, default=0.25, help="allowed relative allocation increase")
+    args = parser.parse_args(argv)
+
+    client = CallbackClient(app.app)
+    results = {}
+    print(f"{'scenario':<62} {'status':>6} {'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7} "
+          f"{'alloc KB':>9} {'resp B':>8}")
+    for name, page, output, values, triggered in scenarios(client):
+        if args.filter not in name:
+            continue
+        r = measure(client, page, output, values, triggered, args.iterations, args.warmup)
+        results[name] = r
+        print(f"{name[:62]:<62} {r['status']:>6} {r['p50_ms']:>7.2f} {r['p95_ms']:>7.2f} {r['p99_ms']:>7.2f} "
+              f"{r['alloc_kb']:>9.0f} {r['response_bytes']:>8}")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({
+                "environment": {
+                    "python": platform.python_version(),
+                    "dash": dash.__version__,
+                    "plotly": plotly.__version__,
+                    "numpy": numpy.__version__,
+                    "iterations": args.iterations,
+                },
+                "results": results,
+            }, f, indent=1)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f)["results"], args)
+        for name, message in regressions:
+            print(f"REGRESSION {name}: {message}")
+        print(f"{len(regressions)} regression(s) against {args.baseline}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
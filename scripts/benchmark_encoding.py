@@ -0,0 +1,142 @@
+"""Compare the encodings of trace data in callback figures: JSON numbers or typed arrays.
+
+Usage: python scripts/benchmark_encoding.py [--iterations N] [--filter TEXT]
+
+Runs the scenarios of benchmark_callbacks.py, keeps the figures built with
+utils.figures and serializes each one as:
+
+- json:    numbers as decimal text, what plotly.py sent before typed arrays,
+- float64: base64 float64 typed arrays,
+- float32: base64 float32 typed arrays,
+- auto:    float32 where it moves no value by more than a millionth of the
+           array's range, float64 otherwise (the default precision with
+           MATHTUTOR_TYPED_ARRAYS=1, see utils.figures).
+
+The pages send json until the pinned Dash bundles a plotly.js that reads
+typed arrays. The decode times here do not show whether a browser can draw
+a figure, check that in a browser.
+
+Reported per figure and encoding: size in bytes plain and brotli (or gzip)
+compressed, median encode time (Figure to JSON text, as Dash does it),
+median decode time (JSON text to numbers; json.loads and base64 to numpy as a
+stand-in for the browser's JSON.parse and typed array views) and the largest
+error of a decoded value relative to its array's range.
+"""
+import argparse
+import base64
+import gzip
+import json
+import statistics
+import sys
+import time
+
+import numpy as np
+from dash._utils import to_json
+
+from benchmark_callbacks import scenarios
+from callback_client import CallbackClient
+
+import app  # pylint: disable=wrong-import-order
+from utils.compression import brotli
+from utils.figures import Figure
+
+ENCODINGS = ("json", "float64", "float32", "auto")
+
+
+def captured_figures(client, page, output, values, triggered):
+    """Return the Figures a callback returned, captured while Dash serializes them."""
+    figures = []
+    original = Figure.to_plotly_json
+
+    def capture(figure):
+        figures.append(figure)
+        return original(figure)
+
+    Figure.to_plotly_json = capture
+    try:
+        client.call(output, values, triggered, page=page)
+    finally:
+        Figure.to_plotly_json = original
+    return figures
+
+
+def encode(figure, encoding):
+    if encoding == "json":
+        # plotly's JSON encoder writes numpy arrays as lists
+        return to_json({"data": figure.data, "layout": figure.layout})
+    return to_json(figure.to_dict(precision=encoding, typed_arrays=True))
+
+
+def decode(text):
+    """Parse a figure's JSON and turn its typed arrays into numpy arrays."""
+    def arrays(node):
+        if isinstance(node, dict):
+            if "bdata" in node:
+                return np.frombuffer(base64.b64decode(node["bdata"]), dtype=node["dtype"])
+            return {key: arrays(value) for key, value in node.items()}
+        if isinstance(node, list):
+            return [arrays(value) for value in node]
+        return node
+
+    return arrays(json.loads(text))
+
+
+def max_error(figure, decoded):
+    """Largest difference between a trace's x/y values and their decoded values, relative to the range."""
+    worst = 0.0
+    for trace, result in zip(figure.data, decoded["data"]):
+        for key in ("x", "y", "z"):
+            if key not in trace:
+                continue
+            expected = np.asarray(trace[key])
+            if expected.dtype.kind not in "fi" or expected.size == 0:
+                continue
+            error = np.abs(np.asarray(result[key], dtype=np.float64) - expected).max()
+            span = expected.max() - expected.min()
+            worst = max(worst, error / span if span else error)
+    return worst
+
+
+def compressed_size(data):
+    if brotli is not None:
+        return len(brotli.compress(data, quality=5))
+    return len(gzip.compress(data, compresslevel=6, mtime=0))
+
+
+def median_ms(func, iterations):
+    times = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--filter", default="", help="only run scenarios whose name contains this text")
+    args = parser.parse_args(argv)
+
+    client = CallbackClient(app.app)
+    compression = "br" if brotli is not None else "gzip"
+    print(f"{'scenario':<52} {'encoding':<8} {'bytes':>7} {compression + ' B':>7} "
+          f"{'enc ms':>7} {'dec ms':>7} {'max error':>9}")
+    for name, page, output, values, triggered in scenarios(client):
+        if args.filter not in name:
+            continue
+        for index, figure in enumerate(captured_figures(client, page, output, values, triggered)):
+            label = name if index == 0 else f"{name} #{index + 1}"
+            for encoding in ENCODINGS:
+                text = encode(figure, encoding)
+                data = text.encode()
+                encode_ms = median_ms(lambda: encode(figure, encoding), args.iterations)  # pylint: disable=cell-var-from-loop
+                decode_ms = median_ms(lambda: decode(text), args.iterations)  # pylint: disable=cell-var-from-loop
+                error = max_error(figure, decode(text))
+                print(f"{label[:52]:<52} {encoding:<8} {len(data):>7} {compressed_size(data):>7} "
+                      f"{encode_ms:>7.3f} {decode_ms:>7.3f} {error:>9.1e}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""Compare gunicorn.conf.py with gunicorn's default settings.
+
+Usage: python scripts/benchmark_gunicorn.py [--seconds S] [--clients N]
+
+For each profile a gunicorn server is started on a local port and N client
+threads POST the callback of the sine parameter page (two 1000 point
+figures and three labels) over keep-alive connections for S seconds. Reported per profile:
+
+- workers: number of worker processes
+- RSS/PSS: per-worker resident and proportional set size after the run, in
+  MB. PSS splits shared pages between the processes sharing them, so it shows
+  how much copy-on-write sharing preloading buys.
+- req/s and p50/p99 latency in ms of the callback POSTs.
+
+Linux only (reads /proc).
+"""
+import argparse
+import http.client
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HOST = "127.0.0.1"
+
+PROFILES = {
+    # An empty config file stops gunicorn from reading ./gunicorn.conf.py
+    "default": ["-c", os.devnull],
+    "gunicorn.conf.py": [],
+}
+
+BUTTONS = ["btn-decPhase", "btn-incPhase", "btn-decAmp", "btn-incAmp",
+           "btn-decFreq", "btn-incFreq", "btn-decCenter", "btn-incCenter"]
+PAGE = "/trig-curve-param"
+
+
+def callback_body(clicks):
+    return json.dumps({
+        "output": "..sin_curve.figure...sin_curve_2.figure...sin_parameters.children"
+                  "...sin_equation.children...sin_equation_2.children..",
+        "outputs": [{"id": "sin_curve", "property": "figure"}, {"id": "sin_curve_2", "property": "figure"},
+                    {"id": "sin_parameters", "property": "children"}, {"id": "sin_equation", "property": "children"},
+                    {"id": "sin_equation_2", "property": "children"}],
+        "inputs": [{"id": b, "property": "n_clicks", "value": clicks if b == "btn-incFreq" else 0}
+                   for b in BUTTONS],
+        "changedPropIds": ["btn-incFreq.n_clicks"],
+    })
+
+
+def wait_for_server(port, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection(HOST, port, timeout=2)
+            conn.request("GET", "/")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("gunicorn did not start")
+
+
+def worker_pids(master_pid):
+    with open(f"/proc/{master_pid}/task/{master_pid}/children", encoding="utf-8") as f:
+        return [int(pid) for pid in f.read().split()]
+
+
+def memory_mb(pid):
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup", encoding="utf-8") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in ("Rss", "Pss"):
+                values[key] = int(rest.split()[0]) / 1024
+    return values["Rss"], values["Pss"]
+
+
+def load(port, seconds, clients):
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    stop_at = time.monotonic() + seconds
+
+    def client(n):
+        conn = http.client.HTTPConnection(HOST, port, timeout=30)
+        headers = {"Content-Type": "application/json", "Referer": f"http://{HOST}:{port}{PAGE}"}
+        clicks = n
+        own = []
+        while time.monotonic() < stop_at:
+            clicks = clicks % 20 + 1
+            start = time.perf_counter()
+            try:
+                conn.request("POST", "/_dash-update-component", callback_body(clicks), headers)
+                response = conn.getresponse()
+                response.read()
+                ok = response.status == 200
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = http.client.HTTPConnection(HOST, port, timeout=30)
+                ok = False
+            if ok:
+                own.append(time.perf_counter() - start)
+            else:
+                with lock:
+                    errors[0] += 1
+        with lock:
+            latencies.extend(own)
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencies, errors[0]
+
+
+def run_profile(name, args, port, seconds, clients):
+    command = [sys.executable, "-m", "gunicorn", *args, "-b", f"{HOST}:{port}", "app:server"]
+    server = subprocess.Popen(command, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for_server(port)
+        # Fetch the callback list once, like a browser does before any click
+        conn = http.client.HTTPConnection(HOST, port)
+        conn.request("GET", "/_dash-dependencies")
+        conn.getresponse().read()
+
+        latencies, errors = load(port, seconds, clients)
+        memory = [memory_mb(pid) for pid in worker_pids(server.pid)]
+    finally:
+        server.terminate()
+        server.wait()
+
+    latencies.sort()
+    return {
+        "profile": name,
+        "workers": len(memory),
+        "rss": statistics.mean(m[0] for m in memory),
+        "pss": statistics.mean(m[1] for m in memory),
+        "rps": len(latencies) / seconds,
+        "p50": latencies[len(latencies) // 2] * 1000 if latencies else float("nan"),
+        "p99": latencies[int(len(latencies) * 0.99)] * 1000 if latencies else float("nan"),
+        "errors": errors,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=8)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args(argv)
+
+    print(f"{'profile':<18} {'workers':>7} {'RSS MB':>7} {'PSS MB':>7} {'req/s':>7} "
+          f"{'p50 ms':>7} {'p99 ms':>7} {'errors':>6}")
+    for name, profile_args in PROFILES.items():
+        r = run_profile(name, profile_args, args.port, args.seconds, args.clients)
+        print(f"{r['profile']:<18} {r['workers']:>7} {r['rss']:>7.1f} {r['pss']:>7.1f} {r['rps']:>7.1f} "
+              f"{r['p50']:>7.1f} {r['p99']:>7.1f} {r['errors']:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Benchmark what one student interaction costs, through the Flask test client.
+
+Usage: python scripts/benchmark_interactions.py [--session NAME] [--iterations N]
+
+Plays the sessions of load_classroom.py without a server: every interaction
+(one click, one slider step) POSTs all callbacks that have the changed
+property as input, like the browser does. Reported per session:
+
+- requests: callback POSTs per interaction,
+- bytes: response bytes per interaction (uncompressed),
+- p50/p95: latency in ms of an interaction, until all its responses are in.
+
+Pages that fan one click out to several callbacks pay the request overhead
+(parsing, routing, JSON) once per callback; this shows it next to the work.
+"""
+import argparse
+import statistics
+import sys
+import time
+
+from callback_client import CallbackClient
+from load_classroom import SESSIONS, plan
+
+import app  # pylint: disable=wrong-import-order
+
+
+def play(client, page, interactions):
+    """POST every interaction once, return [(requests, bytes, seconds)] per interaction."""
+    headers = {"Referer": "http://localhost" + page, "Content-Type": "application/json"}
+    results = []
+    for bodies in interactions:
+        size = 0
+        start = time.perf_counter()
+        for body in bodies:
+            response = client.client.post("/_dash-update-component", data=body, headers=headers)
+            assert response.status_code in (200, 204), response.status_code
+            size += len(response.data)
+        results.append((len(bodies), size, time.perf_counter() - start))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--session", choices=sorted(SESSIONS), help="only run this session")
+    parser.add_argument("--iterations", type=int, default=5, help="times to play each session")
+    args = parser.parse_args(argv)
+
+    client = CallbackClient(app.app)
+    print(f"{'session':<16} {'requests':>8} {'bytes':>8} {'p50 ms':>8} {'p95 ms':>8}")
+    for name, (page, steps) in SESSIONS.items():
+        if args.session and name != args.session:
+            continue
+        page, interactions = plan(client, page, steps)
+        play(client, page, interactions)  # warm up
+        results = [r for _ in range(args.iterations) for r in play(client, page, interactions)]
+        times = sorted(seconds for _, _, seconds in results)
+        requests = statistics.mean(r for r, _, _ in results)
+        size = statistics.mean(s for _, s, _ in results)
+        print(f"{name:<16} {requests:>8.1f} {size:>8.0f} {statistics.median(times) * 1000:>8.2f} "
+              f"{times[int(len(times) * 0.95)] * 1000:>8.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""Benchmark the staircase builder of function A on the primitive page.
+
+Usage: python scripts/benchmark_steps.py [--sizes 1000,100000,1000000]
+                                         [--loop-max N] [--iterations N]
+
+draw_derivative_function used to build its step plot with a loop that called
+np.append twice per history point, copying both arrays every time: quadratic
+in the history length. utils.figures.step_scatter builds the same points with
+np.repeat in one pass. For each history size this prints the median time of
+
+- loop: the old loop (only up to --loop-max points, it would take ~14 s at 10^5),
+- steps: step_scatter alone,
+- figure: draw_derivative_function and its JSON encoding, as a callback would,
+
+in ms and in ns per history point; linear growth keeps ns per point flat.
+Where the loop runs, its points are checked against step_scatter's.
+"""
+import argparse
+import statistics
+import sys
+import time
+
+import numpy as np
+from dash._utils import to_json
+
+import callback_client  # noqa: F401  pylint: disable=unused-import
+
+import app  # noqa: F401  pylint: disable=wrong-import-order,unused-import
+from pages.primitive_area import draw_derivative_function
+from utils.figures import step_scatter
+
+
+def loop_steps(data):
+    """The step points as draw_derivative_function built them before step_scatter."""
+    diffs = np.diff(data)
+    y = np.array([diffs[0], diffs[0]])
+    x = np.array([0, 1])
+    for index in range(len(diffs) - 1):
+        y = np.append(y, np.array([diffs[index + 1], diffs[index + 1]]))
+        x = np.append(x, np.array([index + 1, index + 2]))
+    return x, y
+
+
+def median_ms(func, iterations):
+    times = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,100000,1000000", help="comma separated history lengths")
+    parser.add_argument("--loop-max", type=int, default=10_000, help="largest history to run the old loop on")
+    parser.add_argument("--iterations", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    print(f"{'history':>9} {'loop ms':>9} {'steps ms':>9} {'figure ms':>10} "
+          f"{'loop ns/pt':>11} {'steps ns/pt':>12} {'figure ns/pt':>13}")
+    for size in (int(n) for n in args.sizes.split(",")):
+        data = np.cumsum(rng.integers(-1, 2, size)).tolist()
+        diffs = np.diff(data)
+        loop_ms = float("nan")
+        if size <= args.loop_max:
+            x, y = loop_steps(data)
+            trace = step_scatter(diffs)
+            assert np.array_equal(x, trace["x"]) and np.array_equal(y, trace["y"]), size
+            loop_ms = median_ms(lambda: loop_steps(data), 1)  # pylint: disable=cell-var-from-loop
+        steps_ms = median_ms(lambda: step_scatter(diffs), args.iterations)  # pylint: disable=cell-var-from-loop
+        figure_ms = median_ms(lambda: to_json(draw_derivative_function(data)), args.iterations)  # pylint: disable=cell-var-from-loop
+        print(f"{size:>9} {loop_ms:>9.2f} {steps_ms:>9.2f} {figure_ms:>10.2f} "
+              f"{loop_ms * 1e6 / size:>11.0f} {steps_ms * 1e6 / size:>12.1f} {figure_ms * 1e6 / size:>13.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""Build resized, content-hashed image variants for the app shell.
+
+Run from the repository root before starting the app:
+
+    python scripts/build_assets.py [--budget BYTES]
+
+Every image in IMAGES is resized to each width in WIDTHS and encoded as AVIF
+(when Pillow supports it) and WebP, plus a JPEG fallback for old browsers.
+Files are written to assets/build/ as <name>-<width>w.<hash>.<ext> together
+with a manifest.json that utils/images.py reads to build the <picture> tags.
+The build fails, and writes nothing, if any variant exceeds the byte budget.
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+import shutil
+import sys
+
+from PIL import Image, features
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ASSETS_DIR = os.path.join(ROOT, "assets")
+BUILD_DIR = os.path.join(ASSETS_DIR, "build")
+
+# Images shown in the root layout of app.py
+IMAGES = ["Math_tutor_app_3.png", "Math_tutor_app_3_flipped.png"]
+
+# The banners are displayed 500px wide, 1000px covers 2x screens
+WIDTHS = (500, 1000)
+FALLBACK_WIDTH = 500
+
+FORMATS = {
+    "avif": {"quality": 50},
+    "webp": {"quality": 75, "method": 6},
+}
+FALLBACK_FORMAT = ("jpg", "JPEG", {"quality": 80, "optimize": True, "progressive": True})
+
+DEFAULT_BUDGET = 50_000  # bytes per generated file
+HASH_LENGTH = 10
+
+
+def encode(image, pil_format, options):
+    buffer = io.BytesIO()
+    image.save(buffer, format=pil_format, **options)
+    return buffer.getvalue()
+
+
+def resize(image, width):
+    height = round(image.height * width / image.width)
+    return image.resize((width, height), Image.LANCZOS)
+
+
+def hashed_name(stem, width, data, ext):
+    digest = hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+    return f"{stem}-{width}w.{digest}.{ext}"
+
+
+def build_image(filename, formats):
+    """Return (manifest entry, {output filename: bytes}) for one source image."""
+    stem = os.path.splitext(filename)[0]
+    with Image.open(os.path.join(ASSETS_DIR, filename)) as source:
+        # The banners are opaque, so drop the alpha channel for smaller files
+        image = source.convert("RGB")
+
+    outputs = {}
+    entry = {"width": image.width, "height": image.height, "sources": {}}
+
+    for ext, options in formats.items():
+        variants = []
+        for width in WIDTHS:
+            data = encode(resize(image, width), ext.upper(), options)
+            name = hashed_name(stem, width, data, ext)
+            outputs[name] = data
+            variants.append({"width": width, "path": f"/assets/build/{name}"})
+        entry["sources"][ext] = variants
+
+    ext, pil_format, options = FALLBACK_FORMAT
+    data = encode(resize(image, FALLBACK_WIDTH), pil_format, options)
+    name = hashed_name(stem, FALLBACK_WIDTH, data, ext)
+    outputs[name] = data
+    entry["fallback"] = {"width": FALLBACK_WIDTH, "path": f"/assets/build/{name}"}
+
+    return entry, outputs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget", type=int, default=DEFAULT_BUDGET,
+                        help=f"maximum bytes per generated file (default {DEFAULT_BUDGET})")
+    args = parser.parse_args(argv)
+
+    formats = dict(FORMATS)
+    if not features.check("avif"):
+        print("warning: this Pillow build has no AVIF encoder, skipping AVIF variants")
+        formats.pop("avif")
+
+    manifest = {}
+    outputs = {}
+    for filename in IMAGES:
+        manifest[filename], image_outputs = build_image(filename, formats)
+        outputs.update(image_outputs)
+
+    over_budget = {name: len(data) for name, data in outputs.items() if len(data) > args.budget}
+    for name, data in sorted(outputs.items()):
+        print(f"{len(data):>9,d} B  {name}")
+    if over_budget:
+        for name, size in over_budget.items():
+            print(f"error: {name} is {size:,d} B, budget is {args.budget:,d} B")
+        return 1
+
+    # Start from an empty directory so stale hashes are not served forever
+    shutil.rmtree(BUILD_DIR, ignore_errors=True)
+    os.makedirs(BUILD_DIR)
+    for name, data in outputs.items():
+        with open(os.path.join(BUILD_DIR, name), "wb") as f:
+            f.write(data)
+    with open(os.path.join(BUILD_DIR, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    total = sum(len(data) for data in outputs.values())
+    print(f"wrote {len(outputs)} files ({total:,d} B) to {os.path.relpath(BUILD_DIR, ROOT)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""Call the app's Dash callbacks without a browser, through the Flask test client.
+
+The request bodies are built from _dash-dependencies the way dash-renderer
+builds them. Input and state values default to the values in the page
+layouts (n_clicks=0, slider values, ...) and can be overridden per call:
+
+    client = CallbackClient(app)
+    client.call("triangle.figure", {"btn-right.n_clicks": 3}, page="/triangle-area")
+"""
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import dash  # noqa: E402  pylint: disable=wrong-import-position
+from dash.development.base_component import Component  # noqa: E402  pylint: disable=wrong-import-position
+
+
+def split_output(output):
+    """Return [(component id, property)] of a callback output id."""
+    if output.startswith(".."):
+        parts = output[2:-2].split("...")
+    else:
+        parts = [output]
+    return [tuple(part.rsplit(".", 1)) for part in parts]
+
+
+def layout_values(layout):
+    """Return {"id.prop": value} for every prop of every component with an id in layout."""
+    values = {}
+
+    def walk(node):
+        if isinstance(node, (list, tuple)):
+            for child in node:
+                walk(child)
+        elif isinstance(node, Component):
+            props = node.to_plotly_json()["props"]
+            if isinstance(props.get("id"), str):
+                for prop, value in props.items():
+                    if prop not in ("id", "children"):
+                        values[f"{props['id']}.{prop}"] = value
+            walk(props.get("children"))
+
+    walk(layout)
+    return values
+
+
+class CallbackClient:
+    def __init__(self, app, headers=None):
+        self.app = app
+        self.client = app.server.test_client()
+        self.headers = dict(headers or {})
+        self.client.get("/")
+        self.dependencies = {
+            dep["output"]: dep
+            for dep in json.loads(self.client.get("/_dash-dependencies").data)
+            if not dep.get("clientside_function")
+        }
+        self.defaults = {}
+        for page in dash.page_registry.values():
+            layout = page["layout"]
+            self.defaults.update(layout_values(layout() if callable(layout) else layout))
+
+    def body(self, output, values=None, triggered=None):
+        values = values or {}
+        dep = self.dependencies[output]
+
+        def item(dependency):
+            key = f"{dependency['id']}.{dependency['property']}"
+            value = values[key] if key in values else self.defaults.get(key)
+            return {"id": dependency["id"], "property": dependency["property"], "value": value}
+
+        outputs = [{"id": i, "property": p} for i, p in split_output(output)]
+        return {
+            "output": output,
+            "outputs": outputs if output.startswith("..") else outputs[0],
+            "inputs": [item(d) for d in dep["inputs"]],
+            "state": [item(d) for d in dep["state"]],
+            "changedPropIds": [triggered] if triggered else [],
+        }
+
+    def call(self, output, values=None, triggered=None, page=None, headers=None):
+        """POST one callback, return the Flask test response."""
+        request_headers = dict(self.headers, **(headers or {}))
+        if page is not None:
+            request_headers["Referer"] = "http://localhost" + page
+        return self.client.post("/_dash-update-component", json=self.body(output, values, triggered),
+                                headers=request_headers)
+
+
+# The callback behind the main graph or output of every page, with inputs a
+# student typically reaches: (page, output, input values, triggering input).
+# The unit circle pages have clientside callbacks only.
+MAIN_CALLBACKS = [
+    ("/multiplacation-commutative",
+     "..top-grid-row.children...bottom-grid-row.children...equality-label.children..",
+     {"input-rows.value": 12, "input-cols.value": 12}, "input-rows.value"),
+    ("/percent", "start and end amount.figure",
+     {"btn-incStart.n_clicks": 20, "btn-incPercent.n_clicks": 10}, "btn-incPercent.n_clicks"),
+    ("/percent-promille-ppm",
+     "..percent-input.value...promille-input.value...ppm-input.value"
+     "...percent-graph.figure...promille-graph.figure...ppm-graph.figure..",
+     {"percent-input.value": 25}, "percent-input.value"),
+    ("/primitive-area",
+     "..primitive_function.extendData...derivative_function.extendData...area-drawn-clicks.data..",
+     {"btn-incArea.n_clicks": 30, "btn-decArea.n_clicks": 20, "area-drawn-clicks.data": [20, 0, 29]},
+     "btn-incArea.n_clicks"),
+    ("/set-theory", "..A_only.children...B_only.children...A_and_B.children..",
+     {"input-set-a.value": "1,2,3,4,5,6", "input-set-b.value": "4,5,6,7,8"}, "input-set-a.value"),
+    ("/triangle-sum", "triangle-graph.figure", {"angle-a.value": 75}, "angle-a.value"),
+    ("/triangle-area", "triangle.figure", {"btn-right.n_clicks": 3}, "btn-right.n_clicks"),
+    ("/trig-curve-param",
+     "..sin_curve.figure...sin_curve_2.figure...sin_parameters.children"
+     "...sin_equation.children...sin_equation_2.children..",
+     {"btn-incFreq.n_clicks": 2, "btn-incPhase.n_clicks": 3}, "btn-incPhase.n_clicks"),
+    ("/trig-eq-all-solutions", "sin_curve_solution.figure",
+     {"btn-incY.n_clicks": 1, "btn-incAmp.n_clicks": 1}, "btn-incY.n_clicks"),
+]
@@ -0,0 +1,120 @@
+"""Check that the incremental area graphs show what the whole-history figures show.
+
+Usage: python scripts/check_primitive_history.py [--clicks N] [--seed S]
+                                                 [--batch N] [--drop P]
+
+The primitive page sends only the clicks the graphs do not show yet
+(extend_history returns extendData for both graphs and the clicks drawn,
+keeping the last HISTORY_CLICKS clicks). This plays a random sequence of N
+clicks on the three area buttons, sent in requests of 1 to --batch clicks
+like a browser that batches them, and loses each response with probability
+--drop like a browser that drops a request still in flight. Every response
+that arrives is applied to the figures the page layout starts with, the way
+dcc.Graph does, and after every request the graphs are compared with the
+history of primitive values they should show: the primitive graph must be
+(click, area) for the kept clicks, and function A must be what
+draw_derivative_function draws for that history. With --batch 1 --drop 0
+that history is the clicks as played; clicks drawn together only keep their
+counts, so they are expected in the order decreases, same, increases.
+
+Exits with status 1 if a graph differs.
+"""
+import argparse
+import base64
+import json
+import random
+import sys
+
+import numpy as np
+from dash._utils import to_json
+
+import callback_client  # noqa: F401  pylint: disable=unused-import
+
+import app  # noqa: F401  pylint: disable=wrong-import-order,unused-import
+from pages import primitive_area
+
+BUTTONS = ("btn-decArea", "btn-sameArea", "btn-incArea")
+STEPS = {"btn-decArea": -1, "btn-sameArea": 0, "btn-incArea": 1}
+
+
+def plain(figure):
+    """The JSON figure with typed arrays turned into lists."""
+    def lists(node):
+        if isinstance(node, dict):
+            if "bdata" in node:
+                return np.frombuffer(base64.b64decode(node["bdata"]), dtype=node["dtype"]).tolist()
+            return {key: lists(value) for key, value in node.items()}
+        if isinstance(node, list):
+            return [lists(value) for value in node]
+        return node
+
+    return lists(json.loads(to_json(figure)))
+
+
+def extend(figure, extend_data):
+    """Apply extendData [updates, trace indices, max points] to a JSON figure."""
+    updates, indices, max_points = extend_data
+    for index, trace_index in enumerate(indices):
+        trace = figure["data"][trace_index]
+        for key, values in updates.items():
+            trace[key] = (list(trace.get(key, [])) + list(values[index]))[-max_points:]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clicks", type=int, default=2 * primitive_area.HISTORY_CLICKS + 50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch", type=int, default=3, help="most clicks sent in one request")
+    parser.add_argument("--drop", type=float, default=0.2, help="probability that a response is lost")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    primitive = plain(primitive_area.primitive_figure())
+    derivative = plain(primitive_area.derivative_figure())
+    counts = dict.fromkeys(BUTTONS, 0)
+    drawn = [0, 0, 0]
+    # Primitive values the graphs should show, one per click drawn
+    history = [0]
+    pending = []  # clicks since the last response that arrived
+    kept = primitive_area.HISTORY_CLICKS
+    failures = requests = 0
+    click = 0
+    while click < args.clicks:
+        for _ in range(min(rng.randint(1, args.batch), args.clicks - click)):
+            button = rng.choice(BUTTONS)
+            counts[button] += 1
+            pending.append(button)
+            click += 1
+        requests += 1
+        extend_primitive, extend_derivative, drawn_clicks = primitive_area.extend_history(
+            *(counts[b] for b in BUTTONS), drawn)
+        if rng.random() < args.drop:
+            continue
+        extend(primitive, json.loads(to_json(extend_primitive)))
+        extend(derivative, json.loads(to_json(extend_derivative)))
+        drawn = drawn_clicks
+        # Decreases, same, increases: the order of clicks drawn together
+        for step in sorted(STEPS[button] for button in pending):
+            history.append(history[-1] + step)
+        pending = []
+
+        expected_x = list(range(len(history)))[-(kept + 1):]
+        expected_derivative = plain(primitive_area.draw_derivative_function(history))["data"][0]
+        checks = [
+            ("primitive x", primitive["data"][0]["x"], expected_x),
+            ("primitive y", primitive["data"][0]["y"], history[-(kept + 1):]),
+            ("function A x", derivative["data"][0]["x"], expected_derivative["x"][-2 * kept:]),
+            ("function A y", derivative["data"][0]["y"], expected_derivative["y"][-2 * kept:]),
+            ("area", history[-1], counts["btn-incArea"] - counts["btn-decArea"]),
+        ]
+        for name, actual, expected in checks:
+            if actual != expected:
+                failures += 1
+                print(f"click {click}: {name} {actual if name == 'area' else actual[-4:]} != "
+                      f"{expected if name == 'area' else expected[-4:]}")
+    print(f"{args.clicks} clicks in {requests} requests checked, {failures} difference(s)")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
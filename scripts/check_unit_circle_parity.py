@@ -0,0 +1,110 @@
+"""Check that the clientside unit circle callbacks draw what the Python reference draws.
+
+Usage: python scripts/check_unit_circle_parity.py [--clicks N] [--node PATH]
+
+The angle buttons of the unit circle pages run in the browser
+(assets/unit_circle.js). For every click count from -N to N (more "-" than
+"+" clicks down to more "+" than "-" clicks) this runs each JS function in
+node on the figure the page layout starts with, applies the patch of the
+Python reference function (draw_sin_curve, draw_unity_circle) to the same
+figure, and compares the two figures: labels must be equal, positions may
+differ by 1e-12 (Math.sin and numpy's sin may differ in the last bit).
+
+Exits with status 1 if a figure differs and 2 if node is not installed.
+"""
+import argparse
+import json
+import math
+import os
+import shutil
+import subprocess
+import sys
+
+from callback_client import ROOT
+
+from dash._utils import to_json
+
+import app  # noqa: F401  pylint: disable=wrong-import-order,unused-import
+from pages import trig_all_solutions, trig_curve_unit_circle
+
+ASSET = os.path.join(ROOT, "assets", "unit_circle.js")
+
+# JS function name: (Python reference callback, figure the page layout starts with)
+FUNCTIONS = {
+    "sin_curve": (trig_curve_unit_circle.draw_sin_curve, trig_curve_unit_circle.sin_curve_figure(0.0)),
+    "unity_circle": (trig_curve_unit_circle.draw_unity_circle, trig_curve_unit_circle.unity_circle_figure(0.0)),
+    "both_angles": (trig_all_solutions.draw_unity_circle, trig_all_solutions.unity_circle_figure(0.0)),
+}
+
+# Reads [[function, n_left, n_right, figure], ...] from stdin, writes the figures the functions return
+NODE_SCRIPT = """
+global.window = {};
+require(process.argv[1]);
+let input = "";
+process.stdin.on("data", chunk => input += chunk);
+process.stdin.on("end", () => {
+    const functions = window.dash_clientside.unit_circle;
+    const cases = JSON.parse(input);
+    process.stdout.write(JSON.stringify(cases.map(([name, nLeft, nRight, figure]) => functions[name](nLeft, nRight, figure))));
+});
+"""
+
+
+def apply_patch(figure, patch):
+    """Apply the Merge operations of a serialized dash.Patch to figure."""
+    for operation in patch["operations"]:
+        assert operation["operation"] == "Merge", operation
+        target = figure
+        for key in operation["location"]:
+            target = target[key]
+        target.update(operation["params"]["value"])
+    return figure
+
+
+def differences(expected, actual, path=""):
+    """Return the paths at which two JSON values differ, numbers compared with a tolerance."""
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        if expected.keys() != actual.keys():
+            return [f"{path}: keys {sorted(expected)} != {sorted(actual)}"]
+        return [d for key in expected for d in differences(expected[key], actual[key], f"{path}/{key}")]
+    if isinstance(expected, list) and isinstance(actual, list):
+        if len(expected) != len(actual):
+            return [f"{path}: length {len(expected)} != {len(actual)}"]
+        return [d for i, (e, a) in enumerate(zip(expected, actual)) for d in differences(e, a, f"{path}[{i}]")]
+    numbers = (int, float)
+    if isinstance(expected, numbers) and isinstance(actual, numbers) and not isinstance(expected, bool):
+        return [] if math.isclose(expected, actual, rel_tol=0, abs_tol=1e-12) else [f"{path}: {expected} != {actual}"]
+    return [] if expected == actual else [f"{path}: {expected!r} != {actual!r}"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clicks", type=int, default=100, help="check click counts from -N to N")
+    parser.add_argument("--node", default=shutil.which("node"), help="node executable")
+    args = parser.parse_args(argv)
+    if not args.node:
+        print("node is needed to run assets/unit_circle.js", file=sys.stderr)
+        return 2
+
+    cases, expected = [], []
+    for name, (reference, figure) in FUNCTIONS.items():
+        start = json.loads(to_json(figure))
+        for clicks in range(-args.clicks, args.clicks + 1):
+            n_left, n_right = max(0, -clicks), max(0, clicks)
+            cases.append([name, n_left, n_right, start])
+            patch = json.loads(to_json(reference(n_left, n_right)))
+            expected.append((name, clicks, apply_patch(json.loads(to_json(figure)), patch)))
+
+    result = subprocess.run([args.node, "-e", NODE_SCRIPT, ASSET], input=json.dumps(cases),
+                            capture_output=True, text=True, check=True)
+    failures = 0
+    for (name, clicks, figure), actual in zip(expected, json.loads(result.stdout)):
+        for difference in differences(figure, actual):
+            failures += 1
+            print(f"{name} clicks={clicks} {difference}")
+    print(f"{len(expected)} figures compared, {failures} difference(s)")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
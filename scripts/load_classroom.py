@@ -0,0 +1,224 @@
+"""Simulate a class clicking through the same page at once against gunicorn.
+
+Usage: python scripts/load_classroom.py [--session NAME] [--concurrency 30,100,300]
+                                        [--ramp S] [--think S] [--url URL]
+
+A session is one student: it opens the page (GET page, _dash-layout,
+_dash-dependencies) and then plays a scripted sequence of interactions, for
+example 50 clicks on btn-incFreq on the sine parameter page. Every
+interaction POSTs all callbacks that have the changed property as input,
+one after the other on the session's keep-alive connection, with the input
+values the browser would send at that point.
+
+For each concurrency level that many sessions start within --ramp seconds
+(students do not click at exactly the same moment) and the tool reports:
+
+- req/s: callback POSTs per second over the level,
+- p50/p95/p99: latency in ms of an interaction, i.e. until the responses of
+  all callbacks it triggers have arrived,
+- errors: failed or non-200 requests, in percent of all requests.
+
+Without --url a gunicorn server is started with gunicorn.conf.py (extra
+gunicorn arguments go after --). With hundreds of sessions the Python client
+itself can become the bottleneck; run it on another machine with --url to
+be sure the numbers are the server's.
+"""
+import argparse
+import http.client
+import json
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+
+import dash
+
+from benchmark_gunicorn import ROOT, wait_for_server
+from callback_client import CallbackClient, split_output
+
+import app  # pylint: disable=wrong-import-order
+
+
+def clicks(button, count):
+    return [{f"{button}.n_clicks": n} for n in range(1, count + 1)]
+
+
+def area_clicks(*runs):
+    """clicks() of (button, count) runs on the area buttons, each sent with the clicks drawn before it."""
+    buttons = ("btn-decArea", "btn-sameArea", "btn-incArea")
+    counts = dict.fromkeys(buttons, 0)
+    steps = []
+    for button, count in runs:
+        for _ in range(count):
+            drawn = [counts[b] for b in buttons]
+            counts[button] += 1
+            steps.append({f"{button}.n_clicks": counts[button], "area-drawn-clicks.data": drawn})
+    return steps
+
+
+def drag(slider, start, stop, step):
+    return [{f"{slider}.value": value} for value in range(start, stop + 1, step)]
+
+
+# name: (page, [changed input values per interaction])
+SESSIONS = {
+    "sine-freq": ("/trig-curve-param", clicks("btn-incFreq", 50)),
+    "sine-mixed": ("/trig-curve-param",
+                   clicks("btn-incAmp", 10) + clicks("btn-incPhase", 20) + clicks("btn-incCenter", 10)),
+    "triangle-drag": ("/triangle-sum", drag("angle-a", 20, 130, 5)),
+    "sine-equation": ("/trig-eq-all-solutions", clicks("btn-incY", 10) + clicks("btn-incAmp", 20)),
+    "area": ("/primitive-area", area_clicks(("btn-incArea", 30), ("btn-sameArea", 10), ("btn-decArea", 30))),
+    "grid": ("/multiplacation-commutative",
+             [{"input-rows.value": n, "input-cols.value": n} for n in range(2, 21)]),
+}
+
+
+def page_component_ids(path):
+    layout = next(page["layout"] for page in dash.page_registry.values() if page["path"] == path)
+    layout = layout() if callable(layout) else layout
+    return {getattr(c, "id", None) for c in [layout, *layout._traverse()]}  # pylint: disable=protected-access
+
+
+def plan(client, page, steps):
+    """Turn a session script into a list of callback body JSONs per interaction."""
+    # Pages reuse ids such as btn-inc, the browser only runs the callbacks of the page it shows
+    ids = page_component_ids(page)
+    values = {}
+    interactions = []
+    for changed in steps:
+        values.update(changed)
+        bodies = []
+        for output, dep in client.dependencies.items():
+            triggered = [f"{d['id']}.{d['property']}" for d in dep["inputs"]
+                         if f"{d['id']}.{d['property']}" in changed]
+            on_page = all(d["id"] in ids for d in dep["inputs"]) and all(i in ids for i, _ in split_output(output))
+            if triggered and on_page:
+                body = client.body(output, values, triggered[0])
+                body["changedPropIds"] = triggered
+                bodies.append(body)
+        interactions.append([json.dumps(body) for body in bodies])
+    return page, interactions
+
+
+class Level:
+    """Runs `sessions` simulated students and collects their timings."""
+
+    def __init__(self, host, port, page, interactions, think):
+        self.host, self.port = host, port
+        self.page, self.interactions, self.think = page, interactions, think
+        self.latencies = []
+        self.requests = 0
+        self.errors = 0
+        self.lock = threading.Lock()
+
+    def session(self, delay):
+        time.sleep(delay)
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+        referer = f"http://{self.host}:{self.port}{self.page}"
+        requests = errors = 0
+        latencies = []
+
+        def send(method, path, body=None):
+            nonlocal conn, requests, errors
+            requests += 1
+            try:
+                headers = {"Referer": referer}
+                if body:
+                    headers["Content-Type"] = "application/json"
+                conn.request(method, path, body, headers)
+                response = conn.getresponse()
+                response.read()
+                if response.status in (200, 204):
+                    return True
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+            errors += 1
+            return False
+
+        for path in (self.page, "/_dash-layout", "/_dash-dependencies"):
+            send("GET", path)
+        for bodies in self.interactions:
+            start = time.perf_counter()
+            ok = all([send("POST", "/_dash-update-component", body) for body in bodies])
+            if ok:
+                latencies.append(time.perf_counter() - start)
+            if self.think:
+                time.sleep(self.think)
+        conn.close()
+
+        with self.lock:
+            self.latencies.extend(latencies)
+            self.requests += requests
+            self.errors += errors
+
+    def run(self, sessions, ramp):
+        threads = [threading.Thread(target=self.session, args=(ramp * n / max(1, sessions - 1),))
+                   for n in range(sessions)]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+        latencies = sorted(self.latencies)
+
+        def percentile(fraction):
+            if not latencies:
+                return float("nan")
+            return latencies[min(len(latencies) - 1, int(len(latencies) * fraction))] * 1000
+
+        return {
+            "sessions": sessions,
+            "rps": self.requests / elapsed,
+            "p50": percentile(0.50),
+            "p95": percentile(0.95),
+            "p99": percentile(0.99),
+            "mean": statistics.mean(latencies) * 1000 if latencies else float("nan"),
+            "errors": 100 * self.errors / max(1, self.requests),
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--session", choices=sorted(SESSIONS), default="sine-freq")
+    parser.add_argument("--concurrency", default="30,100,300",
+                        help="comma separated numbers of simultaneous sessions")
+    parser.add_argument("--ramp", type=float, default=5, help="seconds over which the sessions of a level start")
+    parser.add_argument("--think", type=float, default=0.2, help="seconds between two interactions of a session")
+    parser.add_argument("--url", help="server to load instead of starting gunicorn")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("gunicorn_args", nargs="*", help="extra gunicorn arguments, after --")
+    args = parser.parse_args(argv)
+
+    client = CallbackClient(app.app)
+    page, interactions = plan(client, *SESSIONS[args.session])
+    requests = sum(len(bodies) for bodies in interactions)
+    print(f"session {args.session}: {page}, {len(interactions)} interactions, {requests} callback POSTs")
+
+    server = None
+    if args.url:
+        url = urllib.parse.urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        host, port = "127.0.0.1", args.port
+        command = [sys.executable, "-m", "gunicorn", "-b", f"{host}:{port}", *args.gunicorn_args, "app:server"]
+        server = subprocess.Popen(command, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        if server:
+            wait_for_server(port)
+        print(f"{'sessions':>8} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'mean ms':>8} {'errors':>7}")
+        for sessions in (int(n) for n in args.concurrency.split(",")):
+            r = Level(host, port, page, interactions, args.think).run(sessions, args.ramp)
+            print(f"{r['sessions']:>8} {r['rps']:>8.1f} {r['p50']:>8.1f} {r['p95']:>8.1f} {r['p99']:>8.1f} "
+                  f"{r['mean']:>8.1f} {r['errors']:>6.1f}%")
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
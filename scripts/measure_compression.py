@@ -0,0 +1,47 @@
+"""Measure response sizes with and without compression.
+
+Usage: python scripts/measure_compression.py
+
+Prints the size of _dash-layout, _dash-dependencies and the main callback of
+every page (see callback_client.MAIN_CALLBACKS) uncompressed, gzip and brotli
+compressed as served by utils.compression.
+"""
+import time
+
+from callback_client import MAIN_CALLBACKS, CallbackClient, split_output
+
+import app  # pylint: disable=wrong-import-order
+
+ENCODINGS = ("identity", "gzip", "br")
+
+
+def main():
+    client = CallbackClient(app.app)
+
+    rows = []
+    for path in ("/_dash-layout", "/_dash-dependencies"):
+        rows.append((path, {e: client.client.get(path, headers={"Accept-Encoding": e}) for e in ENCODINGS}))
+    for page, output, values, triggered in MAIN_CALLBACKS:
+        responses = {}
+        for encoding in ENCODINGS:
+            responses[encoding] = client.call(output, values, triggered, page=page,
+                                              headers={"Accept-Encoding": encoding})
+        rows.append((f"{page} {split_output(output)[0][0]}", responses))
+
+    print(f"{'response':<58} {'plain B':>8} {'gzip B':>8} {'br B':>8} {'saved':>6}")
+    for name, responses in rows:
+        sizes = {e: len(r.data) for e, r in responses.items()}
+        for encoding, response in responses.items():
+            assert response.status_code == 200, (name, response.status_code)
+            assert response.headers.get("Content-Encoding", "identity") in (encoding, "identity"), name
+        saved = 1 - sizes["br"] / sizes["identity"]
+        print(f"{name[:58]:<58} {sizes['identity']:>8} {sizes['gzip']:>8} {sizes['br']:>8} {saved:>6.0%}")
+
+    start = time.perf_counter()
+    for _ in range(100):
+        client.client.get("/_dash-layout", headers={"Accept-Encoding": "br"})
+    print(f"cached _dash-layout (br): {(time.perf_counter() - start) * 10:.2f} ms per request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Measure worker cold-start time with eager and lazy page loading.
+
+Usage: python scripts/measure_startup.py [--runs N] [--page PATH]
+
+Each run starts a fresh interpreter, imports app (what a gunicorn worker does
+at boot) and then renders one page through the Flask test client (what the
+first student to hit that worker waits for). Medians are printed in ms.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+client = app.server.test_client()
+page = sys.argv[1]
+headers = {"Referer": "http://localhost" + page}
+client.get(page)
+client.get("/_dash-layout")
+client.get("/_dash-dependencies", headers=headers)
+body = {
+    "output": ".._pages_content.children..._pages_store.data..",
+    "outputs": [{"id": "_pages_content", "property": "children"}, {"id": "_pages_store", "property": "data"}],
+    "inputs": [{"id": "_pages_location", "property": "pathname", "value": page},
+               {"id": "_pages_location", "property": "search", "value": ""}],
+    "changedPropIds": ["_pages_location.pathname"],
+}
+assert client.post("/_dash-update-component", json=body, headers=headers).status_code == 200
+served = time.perf_counter()
+pages = sum(name.startswith("pages.") for name in sys.modules)
+print(json.dumps({"import": imported - start, "first_page": served - imported, "pages": pages}))
+"""
+
+
+def run(lazy, page):
+    env = dict(os.environ, MATHTUTOR_LAZY_PAGES="1" if lazy else "0")
+    out = subprocess.run([sys.executable, "-c", CHILD, page], cwd=ROOT, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--page", default="/trig-curve-param")
+    args = parser.parse_args(argv)
+
+    print(f"{'mode':<6} {'import app':>11} {'first page':>11} {'total':>8} {'pages imported':>15}")
+    for lazy in (False, True):
+        results = [run(lazy, args.page) for _ in range(args.runs)]
+        imported = statistics.median(r["import"] for r in results) * 1000
+        first_page = statistics.median(r["first_page"] for r in results) * 1000
+        print(f"{'lazy' if lazy else 'eager':<6} {imported:>11.0f} {first_page:>11.0f} "
+              f"{imported + first_page:>8.0f} {results[0]['pages']:>15}")
+
+
+if __name__ == "__main__":
+    main()
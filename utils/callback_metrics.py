@@ -0,0 +1,236 @@
+"""Latency and payload metrics for every Dash callback, served as Prometheus text on /metrics.
+
+Per callback (labelled with its output id, function name and page module)
+fixed-bucket histograms are kept for
+
+- duration: wall time of the whole callback,
+- function: time spent in the callback function itself (numpy maths and
+  building/validating the plotly figure),
+- validate: the part of function spent constructing plotly graph objects,
+  which is where plotly validates and coerces every property,
+- serialize: time spent encoding the result as JSON,
+- response bytes: size of the JSON response.
+
+Caches report their counters with register_cache_stats(), utils.sine does
+for its grid and curve caches.
+
+Memory is fixed per callback, the histograms only hold bucket counters.
+Every gunicorn worker keeps its own numbers, so samples carry a `pid` label.
+"""
+import contextvars
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+
+import flask
+from dash import _callback
+from dash.exceptions import PreventUpdate
+from plotly.basedatatypes import BaseFigure, BaseLayoutType, BasePlotlyType
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+METRICS = (
+    # (name, help, buckets)
+    ("duration_seconds", "Wall time of the callback, including serialization.", LATENCY_BUCKETS),
+    ("function_seconds", "Time spent in the callback function (maths and figure building).", LATENCY_BUCKETS),
+    ("validate_seconds", "Part of function_seconds spent building and validating plotly objects.", LATENCY_BUCKETS),
+    ("serialize_seconds", "Time spent serializing the callback result to JSON.", LATENCY_BUCKETS),
+    ("response_bytes", "Size of the JSON callback response.", BYTES_BUCKETS),
+)
+
+# metric name prefix -> (stats provider, ((counter, help), ...)) of register_cache_stats
+_cache_stats = {}
+
+# Phase timings of the callback running in the current request
+_current_timings = contextvars.ContextVar("callback_timings", default=None)
+
+
+def _timed_to_json(value, _to_json=_callback.to_json):
+    start = time.perf_counter()
+    try:
+        return _to_json(value)
+    finally:
+        timings = _current_timings.get()
+        if timings is not None:
+            timings["serialize"] = timings.get("serialize", 0.0) + time.perf_counter() - start
+
+
+def _timed_validation(method):
+    @functools.wraps(method)
+    def timed(self, *args, **kwargs):
+        timings = _current_timings.get()
+        if timings is None or timings.get("validating"):
+            # No callback running, or already inside a timed plotly call
+            return method(self, *args, **kwargs)
+        timings["validating"] = True
+        start = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            timings["validating"] = False
+            timings["validate"] = timings.get("validate", 0.0) + time.perf_counter() - start
+
+    return timed
+
+
+# Every property of a plotly object, in constructors, update_* calls and
+# attribute assignments, is validated in one of these
+VALIDATION_METHODS = ((BaseFigure, "__init__"), (BaseFigure, "__setitem__"),
+                      (BasePlotlyType, "__setitem__"), (BaseLayoutType, "__setitem__"))
+
+_timers_installed = False
+
+
+def _install_timers():
+    """Time serialization and plotly validation, once per process and only when metrics are on."""
+    global _timers_installed  # pylint: disable=global-statement
+    if _timers_installed:
+        return
+    # Dash serializes callback results through dash._callback.to_json
+    _callback.to_json = _timed_to_json
+    for cls, name in VALIDATION_METHODS:
+        setattr(cls, name, _timed_validation(getattr(cls, name)))
+    _timers_installed = True
+
+
+def register_cache_stats(name, provider, counters):
+    """Serve counters of caches on /metrics, as mathtutor_<name>_<counter>_total{cache="..."}.
+
+    provider() returns {cache: {counter: value}}, counters is ((counter, help), ...).
+    """
+    _cache_stats[name] = (provider, tuple(counters))
+
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self, name, labels):
+        cumulative = 0
+        for bound, count in zip(self.bounds + ("+Inf",), self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+        yield f"{name}_sum{{{labels}}} {self.sum}"
+        yield f"{name}_count{{{labels}}} {self.count}"
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class CallbackMetrics:
+    """Instruments the callbacks of a Dash app and adds a /metrics route to its server."""
+
+    prefix = "mathtutor_callback_"
+
+    def __init__(self, app, route="/metrics"):
+        self.app = app
+        self._lock = threading.Lock()
+        self._stats = {}  # output id -> (labels, {metric: Histogram}, [errors])
+        self._instrumented = 0
+        _install_timers()
+        app.server.before_request(self._instrument_callbacks)
+        app.server.add_url_rule(route, "callback_metrics", self.serve)
+
+    def _instrument_callbacks(self):
+        # Callbacks reach app.callback_map on the first request, lazily
+        # loaded pages add theirs later
+        if len(self.app.callback_map) == self._instrumented:
+            return
+        with self._lock:
+            # A snapshot: utils.lazy_pages adds callbacks from other threads
+            callbacks = list(self.app.callback_map.items())
+            for output, cb in callbacks:
+                func = cb.get("callback")  # clientside callbacks have none
+                if func is not None and not getattr(func, "instrumented", False):
+                    cb["callback"] = self._instrument(output, func)
+            # Callbacks added meanwhile are seen on the next request
+            self._instrumented = len(callbacks)
+
+    def _instrument(self, output, func):
+        user_func = getattr(func, "__wrapped__", func)
+        labels = ",".join([
+            f'output="{_label(output)}"',
+            f'callback="{_label(user_func.__name__)}"',
+            f'page="{_label(user_func.__module__)}"',
+        ])
+        histograms = {name: Histogram(buckets) for name, _, buckets in METRICS}
+        errors = [0]
+        self._stats[output] = (labels, histograms, errors)
+
+        def instrumented(*args, **kwargs):
+            start = time.perf_counter()
+            timings = {"start": start}
+            # Read by utils.server_timing once the response is ready
+            flask.g.callback_timings = timings
+            flask.g.callback_labels = (output, user_func.__name__, user_func.__module__)
+            token = _current_timings.set(timings)
+            try:
+                response = func(*args, **kwargs)
+            except PreventUpdate:
+                raise
+            except Exception:
+                with self._lock:
+                    errors[0] += 1
+                raise
+            finally:
+                _current_timings.reset(token)
+            duration = time.perf_counter() - start
+            serialize = timings.get("serialize", 0.0)
+            timings["callback"] = duration
+            timings["function"] = duration - serialize
+            timings["bytes"] = len(response)
+            with self._lock:
+                histograms["duration_seconds"].observe(duration)
+                histograms["function_seconds"].observe(timings["function"])
+                histograms["validate_seconds"].observe(timings.get("validate", 0.0))
+                histograms["serialize_seconds"].observe(serialize)
+                histograms["response_bytes"].observe(timings["bytes"])
+            return response
+
+        instrumented.instrumented = True
+        instrumented.__wrapped__ = user_func
+        return instrumented
+
+    def render(self):
+        lines = []
+        # Callbacks may be instrumented in the gunicorn master, before the fork
+        pid = f'pid="{os.getpid()}"'
+        with self._lock:
+            stats = [(f"{labels},{pid}", histograms, errors)
+                     for labels, histograms, errors in self._stats.values()]
+            for name, help_text, _ in METRICS:
+                full_name = self.prefix + name
+                lines.append(f"# HELP {full_name} {help_text}")
+                lines.append(f"# TYPE {full_name} histogram")
+                for labels, histograms, _ in stats:
+                    lines.extend(histograms[name].samples(full_name, labels))
+            lines.append(f"# HELP {self.prefix}errors_total Callbacks that raised an exception.")
+            lines.append(f"# TYPE {self.prefix}errors_total counter")
+            for labels, _, errors in stats:
+                lines.append(f"{self.prefix}errors_total{{{labels}}} {errors[0]}")
+        for prefix, (provider, counters) in list(_cache_stats.items()):
+            caches = provider()
+            for name, help_text in counters:
+                full_name = f"mathtutor_{prefix}_{name}_total"
+                lines.append(f"# HELP {full_name} {help_text}")
+                lines.append(f"# TYPE {full_name} counter")
+                for cache, cache_stats in caches.items():
+                    lines.append(f'{full_name}{{cache="{_label(cache)}",{pid}}} {cache_stats[name]}')
+        return "\n".join(lines) + "\n"
+
+    def serve(self):
+        return flask.Response(self.render(), mimetype="text/plain; version=0.0.4")
@@ -0,0 +1,134 @@
+"""Brotli/gzip compression of the app's responses.
+
+Dash's own `compress=True` needs flask-compress and only does gzip. This
+after_request hook compresses JSON, HTML, JS and CSS responses above a size
+threshold with brotli (if the brotli package is installed and the browser
+accepts it) or gzip.
+
+Responses that are the same for every request, such as _dash-layout,
+_dash-dependencies and the component bundles, are compressed once at a high
+level and the compressed bytes are kept in a small LRU cache keyed by a
+checksum of the uncompressed body, so a changed layout is never served stale.
+"""
+import gzip
+import threading
+import zlib
+from collections import OrderedDict
+
+import flask
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+# Brotli's maximum quality takes seconds on the multi-MB plotly.js bundle
+MAX_QUALITY_SIZE = 256 * 1024
+
+COMPRESSIBLE_MIMETYPES = frozenset([
+    "application/json",
+    "text/html",
+    "text/css",
+    "application/javascript",
+    "text/javascript",
+])
+
+
+class Compression:
+    """Compress responses of a Flask server.
+
+    min_size: responses smaller than this many bytes are sent as they are.
+    gzip_level / brotli_quality: levels for per-request responses; callback
+        responses are compressed on every request, so these favour speed.
+    cached_paths: path prefixes whose compressed bodies are cached, these are
+        compressed with a high level since it is done only once.
+    max_cached: number of cached compressed bodies.
+    """
+
+    def __init__(self, server, min_size=500, gzip_level=6, brotli_quality=5,
+                 cached_paths=("/_dash-layout", "/_dash-dependencies", "/_dash-component-suites/"),
+                 max_cached=64):
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.cached_paths = tuple(cached_paths)
+        self.max_cached = max_cached
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        server.after_request(self.compress_response)
+
+    def _encoding(self):
+        accepted = flask.request.accept_encodings
+        if brotli is not None and accepted["br"]:
+            return "br"
+        if accepted["gzip"]:
+            return "gzip"
+        return None
+
+    def compress(self, data, encoding, cached=False):
+        if encoding == "br":
+            if cached:
+                quality = 11 if len(data) <= MAX_QUALITY_SIZE else 9
+            else:
+                quality = self.brotli_quality
+            return brotli.compress(data, quality=quality)
+        return gzip.compress(data, compresslevel=9 if cached else self.gzip_level, mtime=0)
+
+    def _compress_cached(self, data, encoding):
+        key = (encoding, len(data), zlib.crc32(data))
+        with self._lock:
+            compressed = self._cache.get(key)
+            if compressed is not None:
+                self._cache.move_to_end(key)
+                return compressed
+        compressed = self.compress(data, encoding, cached=True)
+        with self._lock:
+            self._cache[key] = compressed
+            while len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
+        return compressed
+
+    @staticmethod
+    def _not_modified(response, etag, weak):
+        not_modified = flask.Response(status=304)
+        not_modified.set_etag(etag, weak=weak)
+        not_modified.vary.update(response.vary)
+        if "Cache-Control" in response.headers:
+            not_modified.headers["Cache-Control"] = response.headers["Cache-Control"]
+        return not_modified
+
+    def compress_response(self, response):
+        if (
+            response.status_code != 200
+            or response.direct_passthrough
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        ):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        encoding = self._encoding()
+        etag, _ = response.get_etag()
+        if etag and flask.request.if_none_match.contains_weak(etag):
+            # Compressed responses carry W/"..." tags, which Dash's own check
+            # in serve_component_suites compares with the strong tag only
+            return self._not_modified(response, etag, weak=encoding is not None)
+        if encoding is None:
+            return response
+
+        data = response.get_data()
+        if len(data) < self.min_size:
+            return response
+
+        if flask.request.path.startswith(self.cached_paths):
+            compressed = self._compress_cached(data, encoding)
+        else:
+            compressed = self.compress(data, encoding)
+
+        response.set_data(compressed)
+        response.headers["Content-Encoding"] = encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            # The compressed body is not byte-identical to what the ETag was computed from
+            response.set_etag(etag, weak=True)
+        return response
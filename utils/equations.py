@@ -0,0 +1,172 @@
+"""Solve f(x) = c for an expression f typed by a student or teacher.
+
+parse() turns the text into a numpy function of x. Only numbers, x, the
+constants pi and e, + - * / % ** (or ^) and the functions in FUNCTIONS are
+allowed; the expression is checked with `ast` before it is compiled, so no
+other name, attribute or call can be reached. Parsed expressions are cached
+by their text.
+
+roots() evaluates f at dense samples of a window, brackets each sign change of
+f(x) - c at once and refines all brackets together: each step is a false
+position step, with a bisection every third step and whenever the false
+position point leaves the bracket, so every bracket at least halves every
+three steps. Brackets around a pole (tan at pi/2) are dropped after
+refinement because |f(x) - c| grows instead of shrinking there. Roots where f
+touches c without crossing it (x**2 = 0) are only found if a sample lands on
+them exactly.
+
+poles() refines the sign changes of f the same way and returns those where
+|f| grows instead, utils.integration rejects intervals that contain one.
+"""
+import ast
+import functools
+import re
+
+import numpy as np
+
+FUNCTIONS = {
+    "sin": np.sin, "cos": np.cos, "tan": np.tan,
+    "arcsin": np.arcsin, "arccos": np.arccos, "arctan": np.arctan,
+    "asin": np.arcsin, "acos": np.arccos, "atan": np.arctan,
+    "sinh": np.sinh, "cosh": np.cosh, "tanh": np.tanh,
+    "exp": np.exp, "log": np.log, "ln": np.log, "log10": np.log10,
+    "sqrt": np.sqrt, "abs": np.abs,
+}
+CONSTANTS = {"pi": np.pi, "e": np.e}
+
+MAX_LENGTH = 200
+MAX_POINTS = 10**6
+# Brackets refined per solve, a bound on the solve time at high frequencies
+MAX_ROOTS = 10_000
+MAX_STEPS = 100
+
+_OPERATORS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Mod, ast.Pow, ast.UAdd, ast.USub)
+_NUMBER = re.compile(r"\d")
+
+
+def _check(node):
+    """Raise ValueError for any part of the expression tree that is not allowed."""
+    if isinstance(node, ast.Expression):
+        _check(node.body)
+    elif isinstance(node, ast.BinOp) and isinstance(node.op, _OPERATORS):
+        _check(node.left)
+        _check(node.right)
+    elif isinstance(node, ast.UnaryOp) and isinstance(node.op, _OPERATORS):
+        _check(node.operand)
+    elif isinstance(node, ast.Call):
+        if not (isinstance(node.func, ast.Name) and node.func.id in FUNCTIONS):
+            raise ValueError(f"unknown function, use one of {', '.join(FUNCTIONS)}")
+        if len(node.args) != 1 or node.keywords:
+            raise ValueError(f"{node.func.id}() takes one argument")
+        _check(node.args[0])
+    elif isinstance(node, ast.Name):
+        if node.id != "x" and node.id not in CONSTANTS:
+            raise ValueError(f"unknown name {node.id!r}, use x, pi or e")
+    elif isinstance(node, ast.Constant):
+        if type(node.value) not in (int, float):
+            raise ValueError(f"{node.value!r} is not a number")
+    else:
+        raise ValueError(f"{type(node).__name__} is not allowed")
+
+
+class _Floats(ast.NodeTransformer):
+    """Make numbers numpy floats, so 1/0 is inf and 10**10**10 does not build a huge int."""
+
+    def visit_Constant(self, node):
+        return ast.copy_location(ast.Call(ast.Name("_float", ast.Load()), [node], []), node)
+
+
+@functools.lru_cache(maxsize=256)
+def parse(text):
+    """The expression text as a function of a numpy array x; raises ValueError if it is not allowed."""
+    if not text or not text.strip():
+        raise ValueError("enter an expression in x")
+    if len(text) > MAX_LENGTH:
+        raise ValueError(f"the expression is longer than {MAX_LENGTH} characters")
+    try:
+        tree = ast.parse(text.strip().replace("^", "**"), mode="eval")
+    except SyntaxError:
+        hint = " (write 2*x for 2x)" if _NUMBER.search(text) else ""
+        raise ValueError(f"{text!r} is not an expression{hint}") from None
+    _check(tree)
+    code = compile(ast.fix_missing_locations(_Floats().visit(tree)), "<expression>", "eval")
+    namespace = {"__builtins__": {}, "_float": np.float64, **FUNCTIONS, **CONSTANTS}
+
+    def func(x):
+        with np.errstate(all="ignore"):
+            y = eval(code, namespace, {"x": x})  # pylint: disable=eval-used
+        # A constant expression gives one number
+        return np.broadcast_to(np.asarray(y, dtype=float), np.shape(x))
+
+    return func
+
+
+def _refine(func, c, a, b, ga, gb):
+    """Shrink all brackets [a, b] of a sign change of func(x) - c together, return their midpoints.
+
+    ga and gb are func(a) - c and func(b) - c; all four arrays are changed.
+    """
+    tolerance = 4 * np.finfo(float).eps * np.maximum(1.0, np.maximum(np.abs(a), np.abs(b)))
+    for step in range(MAX_STEPS):
+        active = np.flatnonzero(b - a > tolerance)
+        if not len(active):
+            break
+        a_, b_, ga_, gb_ = a[active], b[active], ga[active], gb[active]
+        with np.errstate(all="ignore"):
+            m = b_ - gb_ * (b_ - a_) / (gb_ - ga_)
+        bisect = ~((m > a_) & (m < b_)) if step % 3 != 2 else np.ones(len(m), dtype=bool)
+        m = np.where(bisect, (a_ + b_) / 2, m)
+        gm = func(m) - c
+        left = np.sign(gm) == np.sign(ga_)
+        # gm == 0 ends the bracket at m from both sides
+        a[active] = np.where(left | (gm == 0), m, a_)
+        ga[active] = np.where(left, gm, ga_)
+        b[active] = np.where(~left, m, b_)
+        gb[active] = np.where(~left, gm, gb_)
+    return (a + b) / 2
+
+
+def _crossings(g):
+    """Indices i where the finite samples g[i] and g[i + 1] have opposite signs."""
+    finite = np.isfinite(g)
+    return np.flatnonzero((np.sign(g[:-1]) * np.sign(g[1:]) < 0) & finite[:-1] & finite[1:])
+
+
+def roots(func, c, x, g=None):
+    """The x in the sorted sample points x where func(x) = c, and whether there were more than MAX_ROOTS.
+
+    g is func(x) - c if the caller has it already, it is only computed when
+    missing. Returns (sorted roots, truncated).
+    """
+    if g is None:
+        g = func(x) - c
+    exact = x[g == 0][:MAX_ROOTS]
+    crossing = _crossings(g)
+    truncated = len(exact) + len(crossing) > MAX_ROOTS
+    crossing = crossing[:MAX_ROOTS - len(exact)]
+
+    ga, gb = g[crossing], g[crossing + 1]
+    smallest = np.minimum(np.abs(ga), np.abs(gb))
+    found = _refine(func, c, x[crossing], x[crossing + 1], ga, gb)
+    # At a root |g| shrinks far below the bracket's first values, at a pole it grows
+    keep = np.abs(func(found) - c) < smallest
+    return np.sort(np.concatenate([exact, found[keep]])), truncated
+
+
+def poles(func, x, y=None):
+    """The poles of func between the sorted sample points x where func changes sign, like 1/x at 0.
+
+    y is func(x) if the caller has it already. The first MAX_ROOTS sign
+    changes are refined as in roots(); a pole is where |func| grows far
+    beyond its values at both ends of the bracket. A jump that stays bounded
+    (x/abs(x)) is not a pole, and poles without a sign change (1/x**2) are
+    not found.
+    """
+    if y is None:
+        y = func(x)
+    crossing = _crossings(y)[:MAX_ROOTS]
+    ya, yb = y[crossing], y[crossing + 1]
+    largest = np.maximum(np.abs(ya), np.abs(yb))
+    found = _refine(func, 0.0, x[crossing], x[crossing + 1], ya.copy(), yb.copy())
+    # NaN or inf at the refined point counts as a pole too
+    return found[~(np.abs(func(found)) <= 2 * largest)]
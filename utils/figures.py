@@ -0,0 +1,371 @@
+"""Plain-dict plotly figures for callbacks.
+
+`go.Figure`, `go.Scatter` and every `update_*`/`add_*` call run plotly's
+property validators, which for the small figures of the pages costs more
+than the numpy maths. `Figure` and `scatter` build the same JSON as plain
+dicts, with the parts of the graph_objects API the pages use:
+
+    fig = Figure([scatter(x=x, y=y, mode="lines")])
+    fig.update_layout(showlegend=False, title="Unit circle", title_x=0.5)
+    fig.update_yaxes(range=[-2, 2])
+    fig.add_annotation(x=0, y=1, text="v", showarrow=False)
+    return fig
+
+Keyword arguments follow plotly's "magic underscore" convention
+(`line_color="red"` is `line={"color": "red"}`) and a string title becomes
+`{"text": title}`, so the output matches what graph_objects would send.
+
+Nothing is validated unless validation is switched on, with
+MATHTUTOR_VALIDATE_FIGURES=1 or `figures.VALIDATE = True` (app.py does so
+when run in debug mode): every figure is then also built as a `go.Figure`
+when it is serialized, which raises on invalid properties.
+
+Instead of embedding plotly's default template (7 KB, mostly settings for
+trace types and subplots the pages never draw) in every figure, figures
+name the slim TEMPLATE (`layout.template = "mathtutor"`). register_template
+sends it to the browser once per page load and assets/figure_templates.js
+puts it back in place before plotly.js draws a figure. With
+MATHTUTOR_INLINE_TEMPLATE=1 figures embed plotly's default template again.
+
+numpy arrays are sent as JSON lists. With MATHTUTOR_TYPED_ARRAYS=1 they,
+and lists of 32 or more floats in traces, are sent as base64 typed arrays
+instead, which plotly.js reads without parsing decimal text. The plotly.js
+2.24 bundled with the pinned Dash 2.14 cannot read typed arrays (they came
+with plotly.js 2.28), so they stay off until the Dash pin moves. With typed
+arrays each trace has a precision policy for its float arrays,
+`scatter(..., precision=...)`, defaulting to the figure's
+(`Figure(..., precision=...)`) and to MATHTUTOR_FIGURE_PRECISION:
+
+- "float64": full precision, what graph_objects sends,
+- "float32": half the bytes, about 7 significant digits,
+- "auto" (default): float32 when that moves no value by more than a
+  millionth of the array's range, far below a pixel; float64 otherwise.
+
+Layout arrays (tick values and the like) are always sent as float64.
+"""
+import base64
+import functools
+import hashlib
+import json
+import os
+
+import flask
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io as pio
+from _plotly_utils.utils import is_skipped_key
+
+from utils.images import IMMUTABLE_CACHE_CONTROL
+
+VALIDATE = os.environ.get("MATHTUTOR_VALIDATE_FIGURES", "").lower() in ("1", "true", "yes")
+INLINE_TEMPLATE = os.environ.get("MATHTUTOR_INLINE_TEMPLATE", "").lower() in ("1", "true", "yes")
+# Needs plotly.js 2.28 or later in the browser, see the module docstring
+TYPED_ARRAYS = os.environ.get("MATHTUTOR_TYPED_ARRAYS", "").lower() in ("1", "true", "yes")
+
+PRECISIONS = ("float64", "float32", "auto")
+PRECISION = os.environ.get("MATHTUTOR_FIGURE_PRECISION", "auto")
+# "auto" sends float32 if no value moves by more than this fraction of the array's range
+AUTO_TOLERANCE = 1e-6
+# Shorter lists of numbers in traces stay JSON lists
+MIN_TYPED_LENGTH = 32
+
+# plotly.js typed array names of the numpy dtypes it reads
+TYPED_ARRAY_DTYPES = {
+    "int8": "i1", "uint8": "u1", "int16": "i2", "uint16": "u2",
+    "int32": "i4", "uint32": "u4", "float32": "f4", "float64": "f8",
+}
+
+# What changes when a figure is patched instead of rebuilt, see patch_items
+MOVING = ("x", "y", "text")
+
+TEMPLATE_NAME = "mathtutor"
+
+# The parts of plotly's default template that 2D scatter plots use
+TEMPLATE = {
+    "layout": {
+        "annotationdefaults": {"arrowcolor": "#2a3f5f", "arrowhead": 0, "arrowwidth": 1},
+        "autotypenumbers": "strict",
+        "colorway": ["#636efa", "#EF553B", "#00cc96", "#ab63fa", "#FFA15A",
+                     "#19d3f3", "#FF6692", "#B6E880", "#FF97FF", "#FECB52"],
+        "font": {"color": "#2a3f5f"},
+        "hoverlabel": {"align": "left"},
+        "hovermode": "closest",
+        "paper_bgcolor": "white",
+        "plot_bgcolor": "#E5ECF6",
+        "shapedefaults": {"line": {"color": "#2a3f5f"}},
+        "title": {"x": 0.05},
+        "xaxis": {"automargin": True, "gridcolor": "white", "linecolor": "white", "ticks": "",
+                  "title": {"standoff": 15}, "zerolinecolor": "white", "zerolinewidth": 2},
+        "yaxis": {"automargin": True, "gridcolor": "white", "linecolor": "white", "ticks": "",
+                  "title": {"standoff": 15}, "zerolinecolor": "white", "zerolinewidth": 2},
+    },
+}
+
+# Property names that contain an underscore themselves, the ones plotly.py
+# keeps whole when it splits magic underscores
+UNSPLIT = frozenset([
+    "error_x", "error_y", "error_z",
+    "copy_xstyle", "copy_ystyle", "copy_zstyle",
+    "paper_bgcolor", "plot_bgcolor",
+])
+
+_default_template = None
+
+
+def default_template():
+    """The default template as a plain dict, what go.Figure puts into layout.template."""
+    global _default_template  # pylint: disable=global-statement
+    if _default_template is None:
+        _default_template = pio.templates[pio.templates.default].to_plotly_json()
+    return _default_template
+
+
+def register_template(app, route="/_figure-templates.js"):
+    """Serve TEMPLATE as a script that every page loads once, before any figure is drawn.
+
+    The URL carries a hash of the template, so browsers cache the script for a
+    year and fetch it again only when the template changes.
+    """
+    script = f"window.figureTemplates = {json.dumps({TEMPLATE_NAME: TEMPLATE})};\n"
+    digest = hashlib.sha1(script.encode()).hexdigest()[:10]
+
+    def serve():
+        response = flask.Response(script, mimetype="application/javascript")
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        return response
+
+    app.server.add_url_rule(route, "figure_templates", serve)
+    app.config.external_scripts.append(app.get_relative_path(route) + "?v=" + digest)
+    # go.Figure accepts the name when figures are validated
+    pio.templates[TEMPLATE_NAME] = go.layout.Template(TEMPLATE)
+    return app
+
+
+@functools.lru_cache(maxsize=1024)
+def _split(key):
+    """The path of a magic underscore key, with the names in UNSPLIT kept whole anywhere in it."""
+    if "_" not in key:
+        return (key,)
+    for name in UNSPLIT:
+        key = key.replace(name, name.replace("_", "-"))
+    return tuple(part.replace("-", "_") for part in key.split("_"))
+
+
+def _expand(props):
+    """Return props as nested dicts, with magic underscores split and string titles wrapped."""
+    result = {}
+    for key, value in props.items():
+        path = _split(key)
+        if isinstance(value, dict):
+            value = _expand(value)
+        if path[-1] == "title" and isinstance(value, str):
+            value = {"text": value}
+        target = result
+        for part in path[:-1]:
+            target = target.setdefault(part, {})
+        if isinstance(value, dict) and isinstance(target.get(path[-1]), dict):
+            _merge(target[path[-1]], value)
+        else:
+            target[path[-1]] = value
+    return result
+
+
+def _merge(target, updates):
+    for key, value in updates.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            _merge(target[key], value)
+        else:
+            target[key] = value
+    return target
+
+
+def _float32(values, precision):
+    """Whether to send the float array values as float32 under the precision policy."""
+    if precision == "float64" or values.dtype.itemsize <= 4:
+        return False
+    if precision == "float32":
+        return True
+    if values.size == 0 or not np.isfinite(values).all():
+        return False
+    error = np.abs(values - values.astype(np.float32)).max()
+    return error <= AUTO_TOLERANCE * (values.max() - values.min())
+
+
+def _float_array(values):
+    """values as a numpy array if it is a long list of floats, else None.
+
+    Lists of integers stay JSON: as text they compress better than as bytes.
+    """
+    if len(values) < MIN_TYPED_LENGTH or not isinstance(values[0], float):
+        return None
+    array = np.asarray(values)
+    return array if array.dtype.kind == "f" and array.ndim == 1 else None
+
+
+def _typed_array(values):
+    """A plotly.js typed array spec of the numpy array values, like plotly's to_typed_array_spec.
+
+    plotly's version first checks for dataframes through narwhals, which
+    takes longer than encoding the arrays of the pages.
+    """
+    if values.dtype.kind in "iu" and values.dtype.itemsize == 8 and values.size:
+        # plotly.js has no 64 bit integer arrays
+        smaller = (np.int8, np.int16, np.int32) if values.dtype.kind == "i" else (np.uint8, np.uint16, np.uint32)
+        low, high = values.min(), values.max()
+        for dtype in smaller:
+            if np.iinfo(dtype).min <= low and high <= np.iinfo(dtype).max:
+                values = values.astype(dtype)
+                break
+    name = TYPED_ARRAY_DTYPES.get(str(values.dtype))
+    if name is None or values.size == 0:
+        return values
+    spec = {"dtype": name, "bdata": base64.b64encode(np.ascontiguousarray(values)).decode("ascii")}
+    if values.ndim > 1:
+        spec["shape"] = str(values.shape)[1:-1]
+    return spec
+
+
+def _encode(value, precision=None, typed=True):
+    """Return value with numpy arrays, and in traces long lists of floats, as typed array specs.
+
+    Like plotly's convert_to_base64, but returns new dicts instead of changing
+    value, so a figure can be serialized more than once. precision is the
+    policy of a trace, None for the layout (float64, lists left alone). With
+    typed False numpy arrays become lists and precision is not used.
+    """
+    if isinstance(value, dict):
+        result = {}
+        for key, item in value.items():
+            if typed and precision is not None and isinstance(item, (list, tuple)) and not is_skipped_key(key):
+                array = _float_array(item)
+                if array is not None:
+                    item = array
+            if isinstance(item, np.ndarray) and not typed:
+                item = item.tolist()
+            elif isinstance(item, np.ndarray) and not is_skipped_key(key):
+                if item.dtype.kind == "f" and _float32(item, precision or "float64"):
+                    item = item.astype(np.float32)
+                item = _typed_array(item)
+            elif isinstance(item, (dict, list, tuple)):
+                item = _encode(item, precision, typed)
+            result[key] = item
+        return result
+    if isinstance(value, (list, tuple)):
+        # Lists of numbers or strings are left as they are, only lists of
+        # dicts (shapes, annotations) and nested lists need walking
+        if value and not isinstance(value[0], (dict, list, tuple)):
+            return value
+        return [_encode(item, precision, typed) for item in value]
+    return value
+
+
+def patch_items(target, items, start=0, keys=MOVING):
+    """Merge the moving keys of items into a dash.Patch of a list of traces or annotations.
+
+        patched = Patch()
+        patch_items(patched["data"], angle_traces(n), start=1)
+
+    sends only the positions and labels of data[1:], plotly.js keeps their style.
+    """
+    for index, item in enumerate(items, start):
+        target[index].update({key: item[key] for key in keys if key in item})
+    return target
+
+
+class Trace(dict):
+    """A trace dict that knows the precision policy for its float arrays."""
+
+    def __init__(self, props, precision=None):
+        super().__init__(props)
+        if precision is not None and precision not in PRECISIONS:
+            raise ValueError(f"precision must be one of {PRECISIONS}, not {precision!r}")
+        self.precision = precision
+
+
+def scatter(precision=None, **props):
+    """A scatter trace, like go.Scatter(**props)."""
+    trace = Trace(_expand(props), precision)
+    trace["type"] = "scatter"
+    return trace
+
+
+def step_scatter(values, start=0, precision=None, **props):
+    """A staircase scatter trace: values[i] from x = start + i to start + i + 1.
+
+    The steps are drawn with explicit corner points, x = start, start + 1,
+    start + 1, start + 2, ... and each value twice, built in one vectorized
+    pass, so a trace can be extended one step at a time with extendData.
+    (line_shape="hv" needs half the points, but every step then depends on
+    the point after it.)
+    """
+    values = np.asarray(values)
+    x = np.repeat(np.arange(start, start + len(values) + 1), 2)[1:-1]
+    return scatter(precision=precision, x=x, y=np.repeat(values, 2), **props)
+
+
+class Figure:
+    """A figure as plain dicts, with the subset of the go.Figure API used by the pages."""
+
+    def __init__(self, data=None, layout=None, precision=None, frames=None):
+        # A single trace or a list of traces, like go.Figure
+        self.data = [data] if isinstance(data, dict) else list(data or [])
+        self.layout = _expand(layout or {})
+        # Animation frames as plain dicts: {"name", "data", "traces", "layout"}
+        self.frames = list(frames or [])
+        self.layout["template"] = default_template() if INLINE_TEMPLATE else TEMPLATE_NAME
+        self.precision = precision or PRECISION
+
+    def add_trace(self, trace):
+        self.data.append(trace)
+        return self
+
+    def add_shape(self, **props):
+        self.layout.setdefault("shapes", []).append(_expand(props))
+        return self
+
+    def add_annotation(self, **props):
+        self.layout.setdefault("annotations", []).append(_expand(props))
+        return self
+
+    def add_hline(self, y, **props):
+        """A horizontal line across the whole plot width, like go.Figure.add_hline."""
+        return self.add_shape(type="line", x0=0, x1=1, xref="x domain", y0=y, y1=y, yref="y", **props)
+
+    def update_layout(self, **props):
+        _merge(self.layout, _expand(props))
+        return self
+
+    def update_xaxes(self, **props):
+        _merge(self.layout.setdefault("xaxis", {}), _expand(props))
+        return self
+
+    def update_yaxes(self, **props):
+        _merge(self.layout.setdefault("yaxis", {}), _expand(props))
+        return self
+
+    def update_traces(self, **props):
+        for trace in self.data:
+            _merge(trace, _expand(props))
+        return self
+
+    def to_dict(self, precision=None, typed_arrays=None):
+        """The figure as JSON-ready dicts; precision overrides the policy of every trace.
+
+        typed_arrays defaults to TYPED_ARRAYS, without them arrays are lists.
+        """
+        typed = TYPED_ARRAYS if typed_arrays is None else typed_arrays
+        data = [_encode(trace, precision or getattr(trace, "precision", None) or self.precision, typed)
+                for trace in self.data]
+        # An inlined template is already plain JSON and too big to walk on every call
+        layout = _encode({key: value for key, value in self.layout.items() if key != "template"}, typed=typed)
+        layout["template"] = self.layout["template"]
+        result = {"data": data, "layout": layout}
+        if self.frames:
+            result["frames"] = [_encode(frame, precision or self.precision, typed) for frame in self.frames]
+        return result
+
+    def to_plotly_json(self):
+        """Called by plotly's JSON encoder, which Dash uses for callback results."""
+        if VALIDATE:
+            go.Figure(self.to_dict())
+        return self.to_dict()
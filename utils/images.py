@@ -0,0 +1,68 @@
+"""Responsive images for the variants written by scripts/build_assets.py."""
+import json
+import os
+import re
+
+import flask
+from dash import html
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets")
+MANIFEST_PATH = os.path.join(ASSETS_DIR, "build", "manifest.json")
+
+# Build outputs are named <name>-<width>w.<hash>.<ext>, so their content never changes
+HASHED_ASSET = re.compile(r"/assets/build/[^/]+\.[0-9a-f]{10}\.\w+$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+MIME_TYPES = {"avif": "image/avif", "webp": "image/webp"}
+
+
+def load_manifest(path=MANIFEST_PATH):
+    """Return the build manifest, or an empty dict if the build has not been run."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _srcset(variants):
+    return ", ".join(f"{v['path']} {v['width']}w" for v in variants)
+
+
+def responsive_image(filename, sizes, style=None, manifest=None):
+    """Return a lazily loaded <picture> for an image in assets/.
+
+    The srcset/src values are put in data-* attributes and swapped in by
+    assets/lazy_images.js once the image scrolls into view. Without a build
+    manifest the original file is used, still lazily loaded.
+    """
+    manifest = load_manifest() if manifest is None else manifest
+    entry = manifest.get(filename)
+
+    if entry is None:
+        return html.Picture(html.Img(**{"data-src": f"/assets/{filename}"}, sizes=sizes, style=style))
+
+    sources = [
+        html.Source(type=MIME_TYPES[ext], sizes=sizes, **{"data-srcset": _srcset(variants)})
+        for ext, variants in entry["sources"].items()
+    ]
+    img = html.Img(
+        sizes=sizes,
+        style=style,
+        **{
+            "data-src": entry["fallback"]["path"],
+            "data-srcset": f"{entry['fallback']['path']} {entry['fallback']['width']}w",
+        },
+    )
+    return html.Picture(sources + [img])
+
+
+def add_immutable_cache_headers(server):
+    """Let browsers keep content-hashed build outputs for a year without revalidating."""
+
+    @server.after_request
+    def cache_hashed_assets(response):
+        if response.status_code in (200, 304) and HASHED_ASSET.search(flask.request.path):
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        return response
+
+    return server
@@ -0,0 +1,85 @@
+"""Primitive functions of typed expressions, by cumulative numerical integration.
+
+primitive() evaluates f (parsed by utils.equations) at n evenly spaced points
+of an interval, integrates it cumulatively over all n points, F(x) = the
+integral of f from the start of the interval to x, and only then picks at
+most DISPLAY_POINTS of them for the graphs. Results are cached by
+(expression, interval, n, method).
+
+Two methods, both vectorized over the whole grid:
+
+- trapezoid: exact for straight lines, error O(h**2),
+- simpson: exact for parabolas, error O(h**4). Even points get Simpson's
+  rule over the pairs of steps before them, odd points the integral of the
+  parabola through their step and the next (the last point: the previous)
+  one, like scipy.integrate.cumulative_simpson.
+"""
+import functools
+
+import numpy as np
+
+from utils import equations
+
+METHODS = ("trapezoid", "simpson")
+DISPLAY_POINTS = 2001
+
+
+def cumulative_trapezoid(y, h):
+    """Integral of the samples y, h apart, from the first sample to each sample."""
+    result = np.empty(len(y))
+    result[0] = 0.0
+    np.cumsum((y[1:] + y[:-1]) * (h / 2), out=result[1:])
+    return result
+
+
+def cumulative_simpson(y, h):
+    """Like cumulative_trapezoid with Simpson's rule; needs at least 3 samples."""
+    result = np.empty(len(y))
+    result[0] = 0.0
+    # Simpson over the pairs of steps ending at the even points 2, 4, ...
+    before, middle, after = y[:-2:2], y[1:-1:2], y[2::2]
+    np.cumsum((before + 4*middle + after) * (h / 3), out=result[2::2])
+    # Odd point 2k+1: the even point before it plus the parabola through 2k, 2k+1, 2k+2 up to 2k+1
+    result[1:-1:2] = result[:-2:2] + (5*before + 8*middle - after) * (h / 12)
+    if len(y) % 2 == 0:
+        # The last point has no point after it, the parabola through the two before is used
+        last = len(y) - 1
+        result[last] = result[last - 1] + (-y[last - 2] + 8*y[last - 1] + 5*y[last]) * (h / 12)
+    return result
+
+
+def _display(values, n):
+    """At most DISPLAY_POINTS of n values, evenly picked and including the first and last."""
+    if n <= DISPLAY_POINTS:
+        return values
+    return values[np.linspace(0, n - 1, DISPLAY_POINTS).round().astype(int)]
+
+
+def _read_only(array):
+    array.flags.writeable = False
+    return array
+
+
+@functools.lru_cache(maxsize=64)
+def primitive(text, start, stop, n, method="simpson"):
+    """(x, f(x), F(x)) for display and the area F(stop) of f from start to stop.
+
+    Raises ValueError for expressions equations.parse does not allow and for
+    functions that are not finite everywhere in the interval, or that have a
+    pole between two samples where they change sign (equations.poles).
+    """
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {', '.join(METHODS)}")
+    n = max(3, min(n, equations.MAX_POINTS))
+    f = equations.parse(text)
+    x = np.linspace(start, stop, n)
+    y = f(x)
+    if not np.isfinite(y).all():
+        raise ValueError(f"{text} is not finite everywhere in [{start}, {stop}]")
+    # A pole between two samples (1/x on [-1, 1] with an even n) is finite at every sample
+    if len(equations.poles(f, x, y)):
+        raise ValueError(f"{text} has a pole in [{start}, {stop}]")
+    h = (stop - start) / (n - 1)
+    integral = cumulative_simpson(y, h) if method == "simpson" else cumulative_trapezoid(y, h)
+    shown = (_read_only(_display(x, n)), _read_only(_display(y, n)), _read_only(_display(integral, n)))
+    return shown, float(integral[-1])
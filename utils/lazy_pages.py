@@ -0,0 +1,209 @@
+"""Lazy registration of the page modules in pages/.
+
+With `Dash(use_pages=True)` every page module is imported when the app is
+created, which pulls in numpy/plotly and runs any module level geometry for
+every page before a worker can answer its first request. In lazy mode only
+the `dash.register_page(...)` call of each page file is read (with `ast`, the
+file is not imported) and the module itself, layout and callbacks, is imported
+the first time a request needs it:
+
+- the page layout, when the page container renders the page,
+- `_dash-dependencies` and `_dash-update-component`, for the page in the
+  request's Referer (all pages if there is none).
+
+The Dash renderer fetches the callback list once per full page load, so in
+lazy mode the links between pages must reload the page (`dcc.Link(refresh=True)`).
+
+Lazy mode is switched on with MATHTUTOR_LAZY_PAGES=1.
+"""
+import ast
+import os
+import sys
+import threading
+import importlib.util
+from urllib.parse import urlparse
+
+import flask
+import dash
+from dash import _callback
+from dash._callback_context import context_value
+
+LAZY_PAGES_ENV = "MATHTUTOR_LAZY_PAGES"
+
+# Positional parameters of dash.register_page after `module`
+REGISTER_PAGE_ARGS = ("path", "path_template", "name", "order", "title", "description")
+
+# Keyword arguments of html.*/dcc.* components that hold readable text
+TEXT_KEYWORDS = ("children", "placeholder", "title", "label")
+
+
+def lazy_pages_enabled():
+    return os.environ.get(LAZY_PAGES_ENV, "").lower() in ("1", "true", "yes")
+
+
+def _is_register_page(call):
+    func = call.func
+    return (isinstance(func, ast.Attribute) and func.attr == "register_page") or (
+        isinstance(func, ast.Name) and func.id == "register_page"
+    )
+
+
+def _string_constants(node):
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return [node.value]
+    if isinstance(node, (ast.List, ast.Tuple)):
+        return [s for element in node.elts for s in _string_constants(element)]
+    return []
+
+
+def read_page_file(page_path):
+    """Return (register_page keyword arguments, layout text) of a page file without importing it.
+
+    The keyword arguments are None if the register_page call uses anything
+    but literals, such pages are imported eagerly.
+    """
+    with open(page_path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=page_path)
+
+    metadata = None
+    text = []
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call):
+            continue
+        if _is_register_page(node) and metadata is None:
+            try:
+                metadata = dict(zip(REGISTER_PAGE_ARGS, (ast.literal_eval(a) for a in node.args[1:])))
+                metadata.update(
+                    (kw.arg, ast.literal_eval(kw.value)) for kw in node.keywords if kw.arg != "module"
+                )
+            except ValueError:
+                metadata = None
+        elif isinstance(node.func, ast.Attribute) and isinstance(node.func.value, ast.Name) \
+                and node.func.value.id in ("html", "dcc"):
+            for arg in node.args:
+                text.extend(_string_constants(arg))
+            for kw in node.keywords:
+                if kw.arg in TEXT_KEYWORDS:
+                    text.extend(_string_constants(kw.value))
+
+    return metadata, " ".join(text)
+
+
+class LazyLayout:
+    """Page layout function that imports the page module on first use."""
+
+    def __init__(self, pages, module_name, search_text):
+        self.pages = pages
+        self.module_name = module_name
+        # Read by utils.search so indexing a page does not import it
+        self.search_text = search_text
+
+    @property
+    def loaded(self):
+        return self.module_name in sys.modules
+
+    def __call__(self, **kwargs):
+        layout = self.pages.load(self.module_name).layout
+        return layout(**kwargs) if callable(layout) else layout
+
+
+class LazyPages:
+    """Registers the pages in pages_folder and imports each one on demand."""
+
+    def __init__(self, app, pages_folder="pages"):
+        self.app = app
+        self.pages_folder = os.path.join(flask.helpers.get_root_path(app.config.name), pages_folder)
+        self.package = pages_folder.replace(os.sep, ".")
+        self.files = {}  # module name -> file path
+        self._lock = threading.RLock()
+
+        for root, dirs, files in os.walk(self.pages_folder):
+            dirs[:] = sorted(d for d in dirs if not d.startswith((".", "_")))
+            for file in sorted(files):
+                if file.startswith((".", "_")) or not file.endswith(".py"):
+                    continue
+                page_path = os.path.join(root, file)
+                with open(page_path, encoding="utf-8") as f:
+                    if "register_page" not in f.read():
+                        continue
+                self._register(page_path)
+
+        app.server.before_request(self._load_for_request)
+
+    def _module_name(self, page_path):
+        relative = os.path.relpath(page_path, self.pages_folder)[: -len(".py")]
+        return f"{self.package}.{relative.replace(os.sep, '.')}"
+
+    def _register(self, page_path):
+        module_name = self._module_name(page_path)
+        self.files[module_name] = page_path
+        metadata, search_text = read_page_file(page_path)
+        if metadata is None:
+            self.load(module_name)
+            return
+        if metadata.get("path") is None and metadata.get("path_template") is None:
+            # Same path dash infers for modules in the pages folder
+            relative = module_name[len(self.package) + 1:]
+            metadata["path"] = "/" + relative.replace("_", "-").replace(".", "/").lower()
+        dash.register_page(module_name, layout=LazyLayout(self, module_name, search_text), **metadata)
+
+    def load(self, module_name):
+        """Import a page module (once) and hand its callbacks to the app."""
+        with self._lock:
+            module = sys.modules.get(module_name)
+            if module is not None:
+                return module
+
+            spec = importlib.util.spec_from_file_location(module_name, self.files[module_name])
+            module = importlib.util.module_from_spec(spec)
+            # The page is registered already, and register_page refuses to
+            # run inside a request
+            token = context_value.set({"ignore_register_page": True})
+            try:
+                spec.loader.exec_module(module)
+            finally:
+                context_value.reset(token)
+            sys.modules[module_name] = module
+            self._merge_callbacks()
+            return module
+
+    def load_all(self):
+        for module_name in self.files:
+            self.load(module_name)
+
+    def _merge_callbacks(self):
+        # Before the first request Dash copies dash.callback registrations
+        # itself (Dash._setup_server), afterwards it has to be done here
+        if not self.app._got_first_request["setup_server"]:  # pylint: disable=protected-access
+            return
+        for key in list(_callback.GLOBAL_CALLBACK_MAP):
+            self.app.callback_map[key] = _callback.GLOBAL_CALLBACK_MAP.pop(key)
+        self.app._callback_list.extend(_callback.GLOBAL_CALLBACK_LIST)  # pylint: disable=protected-access
+        _callback.GLOBAL_CALLBACK_LIST.clear()
+
+    def _page_for_referrer(self):
+        referrer = flask.request.referrer
+        if not referrer:
+            return None
+        path = self.app.strip_relative_path(urlparse(referrer).path) or ""
+        for module_name, page in dash.page_registry.items():
+            if module_name in self.files and page["path"].strip("/") == path.strip("/"):
+                return module_name
+        return None
+
+    def _load_for_request(self):
+        prefix = self.app.config.routes_pathname_prefix
+        if flask.request.path not in (prefix + "_dash-dependencies", prefix + "_dash-update-component"):
+            return
+
+        module_name = self._page_for_referrer()
+        if module_name is None:
+            self.load_all()
+            return
+        self.load(module_name)
+
+        if flask.request.path.endswith("_dash-update-component"):
+            output = (flask.request.get_json(silent=True) or {}).get("output")
+            if output not in self.app.callback_map:
+                # A callback from another page, e.g. a stale browser tab
+                self.load_all()
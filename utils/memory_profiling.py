@@ -0,0 +1,196 @@
+"""tracemalloc diagnostics mode: which page and callback allocates and retains memory.
+
+Switched on with MATHTUTOR_TRACEMALLOC=<frames> (1 is enough to find the
+allocating line, more frames give the call path). Tracing makes Python
+allocations roughly twice as slow, so this is a diagnostics mode and not
+meant to stay on.
+
+For every callback request:
+
+- peak: the highest traced memory above the start of the request, i.e. how
+  much the callback, its figure and the JSON response need at once,
+
+and for the first and then every MATHTUTOR_TRACEMALLOC_EVERY-th (default
+20) request of each callback, with a full garbage collection before and
+after so that only live objects count:
+
+- retained: memory still allocated when the request is done, not counting
+  the response body that is about to be sent,
+- the allocation sites (file:line) of that retained memory, from comparing a
+  tracemalloc snapshot taken before the request with one taken after it.
+
+/_admin/memory?top=N (needs MATHTUTOR_ADMIN_TOKEN, see utils.profiling)
+returns a text report: callbacks by peak, callbacks by retained memory with
+their top allocation sites, and the top allocation sites of the whole heap
+compared with the heap when diagnostics started.
+
+tracemalloc is process wide, so run the worker with one thread
+(GUNICORN_THREADS=1) to keep the numbers of concurrent requests apart.
+"""
+import gc
+import os
+import threading
+import tracemalloc
+from collections import Counter
+
+import flask
+
+from utils.profiling import ADMIN_TOKEN_ENV, require_admin_token
+
+TRACEMALLOC_ENV = "MATHTUTOR_TRACEMALLOC"
+SNAPSHOT_EVERY_ENV = "MATHTUTOR_TRACEMALLOC_EVERY"
+
+# Allocations of the diagnostics themselves and of imports
+IGNORED_FILES = frozenset([
+    __file__,
+    tracemalloc.__file__,
+    "<frozen importlib._bootstrap>",
+    "<frozen importlib._bootstrap_external>",
+    "<unknown>",
+])
+
+
+def tracemalloc_frames():
+    """Number of frames to trace, 0 if diagnostics are off."""
+    try:
+        return max(0, int(os.environ.get(TRACEMALLOC_ENV, 0)))
+    except ValueError:
+        return 1
+
+
+def _sizes_by_site():
+    """Return Counter({traceback frames: bytes}) of all traced memory blocks.
+
+    The frames are (filename, lineno) pairs, the allocating line first.
+    Snapshot.statistics groups the blocks by traceback in one pass, where
+    compare_to and filter_traces take far longer on a worker's heap.
+    """
+    sizes = Counter()
+    for stat in tracemalloc.take_snapshot().statistics("traceback"):
+        # Tracebacks are ordered from the oldest frame to the most recent
+        sizes[tuple((frame.filename, frame.lineno) for frame in reversed(stat.traceback))] += stat.size
+    return sizes
+
+
+def _growth(before, after):
+    """Return [(site, bytes)] of the sites that hold more memory in after than in before, largest first."""
+    growth = [(frames, size - before.get(frames, 0)) for frames, size in after.items()
+              if size > before.get(frames, 0) and frames and frames[0][0] not in IGNORED_FILES]
+    return sorted(growth, key=lambda item: -item[1])
+
+
+def _site(frames):
+    return " <- ".join(f"{filename}:{lineno}" for filename, lineno in frames)
+
+
+class CallbackMemory:
+    __slots__ = ("calls", "peak_max", "peak_sum", "sampled", "retained_sum", "sites")
+
+    def __init__(self):
+        self.calls = 0
+        self.peak_max = 0
+        self.peak_sum = 0
+        self.sampled = 0
+        self.retained_sum = 0
+        self.sites = Counter()  # allocation site -> retained bytes, summed over sampled requests
+
+
+class MemoryProfiler:
+    """Attributes traced allocations of callback requests to their callback."""
+
+    max_sites = 50  # per callback
+
+    def __init__(self, app, frames=1, snapshot_every=None, route="/_admin/memory"):
+        self.app = app
+        self.snapshot_every = snapshot_every or int(os.environ.get(SNAPSHOT_EVERY_ENV, 20))
+        self._lock = threading.Lock()
+        self._stats = {}  # output id -> CallbackMemory
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        self._baseline = _sizes_by_site()
+        app.server.before_request(self._start)
+        # Set up before Compression, so this sees the body that is sent
+        app.server.after_request(self._response_size)
+        app.server.teardown_request(self._finish)
+        token = os.environ.get(ADMIN_TOKEN_ENV)
+        if token:
+            app.server.add_url_rule(route, "memory_profiler", lambda: self.serve(token))
+
+    def _start(self):
+        if not flask.request.path.endswith("/_dash-update-component"):
+            return
+        output = (flask.request.get_json(silent=True) or {}).get("output")
+        if output is None:
+            return
+        with self._lock:
+            stats = self._stats.setdefault(output, CallbackMemory())
+            sample = stats.calls % self.snapshot_every == 0
+            stats.calls += 1
+        state = {"output": output, "snapshot": None, "response": 0}
+        if sample:
+            gc.collect()
+            state["snapshot"] = _sizes_by_site()
+            # The snapshot's statistics leave reference cycles behind
+            gc.collect()
+        state["current"] = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        flask.g.memory_state = state
+
+    @staticmethod
+    def _response_size(response):
+        state = flask.g.get("memory_state")
+        if state is not None and not response.direct_passthrough:
+            state["response"] = len(response.get_data())
+        return response
+
+    def _finish(self, _exc=None):
+        state = flask.g.pop("memory_state", None)
+        if state is None:
+            return
+        peak = tracemalloc.get_traced_memory()[1] - state["current"]
+        retained = sites = None
+        if state["snapshot"] is not None:
+            gc.collect()
+            retained = tracemalloc.get_traced_memory()[0] - state["current"] - state["response"]
+            sites = [(_site(frames), size) for frames, size in _growth(state["snapshot"], _sizes_by_site())]
+        with self._lock:
+            stats = self._stats[state["output"]]
+            stats.peak_max = max(stats.peak_max, peak)
+            stats.peak_sum += peak
+            if retained is not None:
+                stats.sampled += 1
+                stats.retained_sum += retained
+                stats.sites.update(dict(sites[:self.max_sites]))
+                if len(stats.sites) > self.max_sites:
+                    stats.sites = Counter(dict(stats.sites.most_common(self.max_sites)))
+
+    def _labels(self, output):
+        cb = self.app.callback_map.get(output, {}).get("callback")
+        func = getattr(cb, "__wrapped__", cb)
+        return f"{func.__module__}.{func.__name__}" if func is not None else output
+
+    def report(self, top=10):
+        with self._lock:
+            stats = {output: s for output, s in self._stats.items() if s.calls}
+            lines = ["Callbacks by peak allocation (KB): peak max, peak mean, calls, callback [output]"]
+            for output, s in sorted(stats.items(), key=lambda item: -item[1].peak_max)[:top]:
+                lines.append(f"{s.peak_max / 1024:10.0f} {s.peak_sum / s.calls / 1024:10.0f} {s.calls:6} "
+                             f"{self._labels(output)} [{output}]")
+            lines += ["", "Callbacks by retained memory per request (KB), with their top allocation sites"]
+            sampled = [(output, s) for output, s in stats.items() if s.sampled]
+            for output, s in sorted(sampled, key=lambda item: -item[1].retained_sum / item[1].sampled)[:top]:
+                lines.append(f"{s.retained_sum / s.sampled / 1024:10.1f} {self._labels(output)} "
+                             f"({s.sampled} sampled requests)")
+                for site, size in s.sites.most_common(3):
+                    lines.append(f"{'':10} {size / s.sampled / 1024:8.1f} KB  {site}")
+        current, peak = tracemalloc.get_traced_memory()
+        lines += ["", f"Heap growth since diagnostics started, by allocation site (traced now "
+                      f"{current / 2**20:.1f} MB, peak {peak / 2**20:.1f} MB)"]
+        for frames, size in _growth(self._baseline, _sizes_by_site())[:top]:
+            lines.append(f"{size / 1024:+10.1f} KB  {_site(frames)}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, token):
+        require_admin_token(token)
+        top = flask.request.args.get("top", 10, type=int)
+        return flask.Response(self.report(top), mimetype="text/plain")
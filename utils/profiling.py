@@ -0,0 +1,210 @@
+"""On-demand profiling of selected callbacks in a running server.
+
+A callback is armed for its next N calls, either at startup with
+
+    MATHTUTOR_PROFILE=draw_derivative_function:20[:sample]
+
+(comma separated for several callbacks) or at runtime through the admin
+route, which only exists when MATHTUTOR_ADMIN_TOKEN is set:
+
+    curl -H "Authorization: Bearer $TOKEN" -d callback=draw_derivative_function \
+         -d calls=20 -d mode=cprofile http://host/_admin/profile
+
+Callbacks are matched by function name or by module and name, e.g.
+pages.primitive_area.draw_derivative_function. A name that matches no
+callback once every page is imported is logged and dropped. Every profiled
+call writes a
+file to MATHTUTOR_PROFILE_DIR (default ./profiles):
+
+- mode cprofile: a deterministic cProfile `.prof` (pstats, snakeviz, ...),
+- mode sample: a `.collapsed` file of stacks sampled every millisecond, one
+  "frame;frame;frame count" line per stack, as read by flamegraph.pl and
+  speedscope.
+
+An armed callback is wrapped only for its N calls and then put back, so
+callbacks that are not being profiled run unchanged.
+"""
+import cProfile
+import hmac
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+import dash
+import flask
+from dash import _callback
+
+PROFILE_ENV = "MATHTUTOR_PROFILE"
+PROFILE_DIR_ENV = "MATHTUTOR_PROFILE_DIR"
+ADMIN_TOKEN_ENV = "MATHTUTOR_ADMIN_TOKEN"
+
+MODES = ("cprofile", "sample")
+
+logger = logging.getLogger("mathtutor.profiling")
+
+
+class StackSampler:
+    """Samples the stack of one thread in a background thread."""
+
+    def __init__(self, thread_id, interval=0.001):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)  # pylint: disable=protected-access
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{frame.f_globals.get('__name__', '?')}:{code.co_name}:{frame.f_lineno}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self):
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def require_admin_token(token):
+    """Abort the current request unless it carries `Authorization: Bearer <token>`."""
+    expected = f"Bearer {token}".encode()
+    if not hmac.compare_digest(flask.request.headers.get("Authorization", "").encode(), expected):
+        flask.abort(403)
+
+
+def parse_profile_env(value):
+    """Return [(callback, calls, mode)] from a MATHTUTOR_PROFILE value."""
+    targets = []
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        name, calls, mode = (item.split(":", 2) + [None, None])[:3]
+        targets.append((name, int(calls or 10), mode or "cprofile"))
+    return targets
+
+
+class CallbackProfiler:
+    """Profiles the next N calls of named callbacks of a Dash app."""
+
+    def __init__(self, app, directory=None, route="/_admin/profile"):
+        self.app = app
+        self.directory = directory or os.environ.get(PROFILE_DIR_ENV, "profiles")
+        self._lock = threading.Lock()
+        self._armed = {}  # callback name -> [calls left, mode]
+        self._pending = False
+        for name, calls, mode in parse_profile_env(os.environ.get(PROFILE_ENV, "")):
+            self.arm(name, calls, mode)
+        app.server.before_request(self._install)
+        self._token = os.environ.get(ADMIN_TOKEN_ENV)
+        if self._token:
+            app.server.add_url_rule(route, "callback_profiler", self.admin, methods=["GET", "POST"])
+
+    def arm(self, callback, calls=10, mode="cprofile"):
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}, not {mode!r}")
+        with self._lock:
+            self._armed[callback] = [int(calls), mode]
+            self._pending = True
+
+    @staticmethod
+    def _names(func):
+        user_func = getattr(func, "__wrapped__", func)
+        return user_func.__name__, f"{user_func.__module__}.{user_func.__name__}"
+
+    def _install(self):
+        # A single attribute check per request unless something was just armed
+        if not self._pending:
+            return
+        with self._lock:
+            found = set()
+            # A snapshot: utils.lazy_pages adds callbacks from other threads
+            for output, cb in list(self.app.callback_map.items()):
+                func = cb.get("callback")
+                if func is None:
+                    continue
+                for name in self._names(func):
+                    if name not in self._armed:
+                        continue
+                    found.add(name)
+                    # Armed again while still wrapped, the wrapper reads the new count
+                    if not getattr(func, "profiled", False):
+                        cb["callback"] = self._profiled(output, func, name)
+            missing = set(self._armed) - found
+            # Callbacks of lazily loaded pages only show up once their page is imported
+            if missing and self._pages_loaded():
+                for name in sorted(missing):
+                    logger.warning("no callback named %r to profile", name)
+                    del self._armed[name]
+                missing = set()
+            self._pending = bool(missing)
+
+    @staticmethod
+    def _pages_loaded():
+        # utils.lazy_pages.LazyLayout tells whether its page module is imported;
+        # an imported page's callbacks wait in GLOBAL_CALLBACK_MAP until merged
+        return not _callback.GLOBAL_CALLBACK_MAP and all(
+            getattr(page["layout"], "loaded", True) for page in dash.page_registry.values())
+
+    def _restore(self, output, func):
+        cb = self.app.callback_map.get(output)
+        if cb is not None and getattr(cb["callback"], "original", None) is func:
+            cb["callback"] = func
+
+    def _profiled(self, output, func, name):
+        def profiled(*args, **kwargs):
+            with self._lock:
+                armed = self._armed.get(name)
+                if not armed or armed[0] <= 0:
+                    self._restore(output, func)
+                    return func(*args, **kwargs)
+                armed[0] -= 1
+                mode = armed[1]
+                if armed[0] == 0:
+                    del self._armed[name]
+                    self._restore(output, func)
+            base = os.path.join(self.directory, f"{name}-{os.getpid()}-{time.time_ns()}")
+            os.makedirs(self.directory, exist_ok=True)
+            if mode == "sample":
+                with StackSampler(threading.get_ident()) as sampler:
+                    try:
+                        return func(*args, **kwargs)
+                    finally:
+                        with open(base + ".collapsed", "w", encoding="utf-8") as f:
+                            f.write(sampler.collapsed())
+            profile = cProfile.Profile()
+            try:
+                return profile.runcall(func, *args, **kwargs)
+            finally:
+                profile.dump_stats(base + ".prof")
+
+        # Keeps __wrapped__ and the marker of utils.callback_metrics
+        profiled.__dict__.update(func.__dict__)
+        profiled.profiled = True
+        profiled.original = func
+        return profiled
+
+    def admin(self):
+        require_admin_token(self._token)
+        if flask.request.method == "POST":
+            form = flask.request.values
+            if not form.get("callback"):
+                flask.abort(400, "callback is required")
+            try:
+                self.arm(form["callback"], int(form.get("calls", 10)), form.get("mode", "cprofile"))
+            except ValueError as err:
+                flask.abort(400, str(err))
+        with self._lock:
+            armed = {name: {"calls_left": calls, "mode": mode} for name, (calls, mode) in self._armed.items()}
+        return flask.jsonify(armed=armed, directory=os.path.abspath(self.directory))
@@ -0,0 +1,168 @@
+"""Full-text page index for the search box, queried in the browser by assets/page_search.js.
+
+The index is built once at startup from every registered page's name,
+description and layout text. It is shipped to the browser as a compact
+inverted index:
+
+    {
+        "pages": [[name, path], ...],
+        "terms": [term, ...],                   # sorted, for prefix lookups
+        "postings": [[page id, ...], ...],      # one list per term
+        "trigrams": {trigram: [term id, ...]},  # for misspelled queries
+        "stopwords": [word, ...],               # dropped from queries as well
+        "reload": bool,                         # links reload the whole app
+    }
+"""
+import re
+from collections import defaultdict
+
+import flask
+from dash import dcc
+from dash.development.base_component import Component
+
+TOKEN = re.compile(r"\w+")
+
+# Props other than children that hold text a student can read
+TEXT_PROPS = ("placeholder", "title", "label")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by can for from has how if in into is it its of on "
+    "or so that the their then these this to two used using was what when "
+    "where which will with you your".split()
+)
+
+
+def tokenize(text):
+    return [t for t in TOKEN.findall(text.lower()) if len(t) > 1 and t not in STOPWORDS]
+
+
+def trigrams(term):
+    padded = f" {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def layout_text(layout):
+    """Return all text in a layout tree (a component, list, string or layout function)."""
+    # Lazily imported pages (utils.lazy_pages) carry their text, calling them would import the page
+    search_text = getattr(layout, "search_text", None)
+    if search_text is not None:
+        return search_text
+
+    if callable(layout):
+        try:
+            layout = layout()
+        except Exception:  # pylint: disable=broad-except
+            # Layout functions may need path variables, index them by name only
+            return ""
+
+    parts = []
+
+    def walk(node):
+        if node is None:
+            return
+        if isinstance(node, (str, int, float)):
+            parts.append(str(node))
+        elif isinstance(node, (list, tuple)):
+            for child in node:
+                walk(child)
+        elif isinstance(node, Component):
+            for prop in TEXT_PROPS:
+                value = getattr(node, prop, None)
+                if isinstance(value, str):
+                    parts.append(value)
+            walk(getattr(node, "children", None))
+
+    walk(layout)
+    return " ".join(parts)
+
+
+class PageSearchIndex:
+    """Inverted index over the pages in dash.page_registry.
+
+    sync() only re-extracts the text of pages that are new or whose layout
+    changed, so it is cheap to call again after pages are added.
+    """
+
+    def __init__(self):
+        self._pages = {}  # module -> (signature, name, path, terms)
+        self._postings = defaultdict(set)  # term -> modules
+
+    @staticmethod
+    def _signature(page):
+        return (id(page.get("layout")), page["name"], page["path"], page.get("description"))
+
+    def _remove(self, module):
+        _, _, _, terms = self._pages.pop(module)
+        for term in terms:
+            self._postings[term].discard(module)
+            if not self._postings[term]:
+                del self._postings[term]
+
+    def _add(self, module, page):
+        text = " ".join([page["name"], page.get("description") or "", layout_text(page.get("layout"))])
+        terms = frozenset(tokenize(text))
+        self._pages[module] = (self._signature(page), page["name"], page["path"], terms)
+        for term in terms:
+            self._postings[term].add(module)
+
+    def sync(self, registry):
+        """Bring the index in line with registry, return True if anything changed."""
+        changed = False
+        for module in [m for m in self._pages if m not in registry]:
+            self._remove(module)
+            changed = True
+        for module, page in registry.items():
+            entry = self._pages.get(module)
+            if entry is not None and entry[0] == self._signature(page):
+                continue
+            if entry is not None:
+                self._remove(module)
+            self._add(module, page)
+            changed = True
+        return changed
+
+    def to_json(self):
+        modules = list(self._pages)
+        page_ids = {module: i for i, module in enumerate(modules)}
+        terms = sorted(self._postings)
+
+        trigram_postings = defaultdict(list)
+        for term_id, term in enumerate(terms):
+            for trigram in trigrams(term):
+                trigram_postings[trigram].append(term_id)
+
+        return {
+            "pages": [[self._pages[m][1], self._pages[m][2]] for m in modules],
+            "terms": terms,
+            "postings": [sorted(page_ids[m] for m in self._postings[t]) for t in terms],
+            "trigrams": dict(trigram_postings),
+            "stopwords": sorted(STOPWORDS),
+        }
+
+
+def page_index_store(app, registry, store_id="page-index", reload_pages=False):
+    """Return a dcc.Store holding the search index of the pages in registry.
+
+    In debug mode the index is synced before every layout request, so pages
+    added while the dev server is running become searchable on reload.
+    With reload_pages the search results are links that reload the app
+    (needed for lazily loaded pages, see utils.lazy_pages).
+    """
+    index = PageSearchIndex()
+
+    def index_data():
+        return dict(index.to_json(), reload=reload_pages)
+
+    index.sync(registry)
+    store = dcc.Store(id=store_id, data=index_data())
+
+    @app.server.before_request
+    def refresh_page_index():
+        if not app.server.debug:
+            return
+        if flask.request.path != app.config.routes_pathname_prefix + "_dash-layout":
+            return
+        if index.sync(registry):
+            store.data = index_data()
+
+    return store
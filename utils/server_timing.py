@@ -0,0 +1,99 @@
+"""Server-Timing header and sampled log line for every Dash callback request.
+
+Browser devtools show the Server-Timing header of a request in its Timing
+tab, so "the graph is laggy" can be split into
+
+- parse: from the start of the request to the callback being called (JSON
+  body parsing, Dash's input handling, page loading in lazy mode),
+- function: the callback function without the plotly part,
+- validate: constructing and validating plotly graph objects,
+- serialize: encoding the result as JSON,
+- total: the whole request up to the response, including compression.
+
+The phase timings come from utils.callback_metrics, so CallbackMetrics must
+be set up on the app as well.
+
+With MATHTUTOR_CALLBACK_LOG_RATE=0.05 one in twenty callback requests is
+also logged as a JSON line to the "mathtutor.callbacks" logger.
+"""
+import json
+import logging
+import os
+import random
+import time
+
+import flask
+
+LOG_RATE_ENV = "MATHTUTOR_CALLBACK_LOG_RATE"
+
+logger = logging.getLogger("mathtutor.callbacks")
+
+DESCRIPTIONS = {
+    "parse": "input parsing",
+    "function": "callback function",
+    "validate": "figure validation",
+    "serialize": "JSON serialization",
+    "total": "request",
+}
+
+
+def callback_log_rate():
+    try:
+        return min(1.0, max(0.0, float(os.environ.get(LOG_RATE_ENV, 0))))
+    except ValueError:
+        return 0.0
+
+
+class ServerTiming:
+    """Adds a Server-Timing header to _dash-update-component responses.
+
+    log_rate: fraction of callback requests written to the log, defaults to
+        MATHTUTOR_CALLBACK_LOG_RATE.
+    """
+
+    def __init__(self, server, log_rate=None):
+        self.log_rate = callback_log_rate() if log_rate is None else log_rate
+        if self.log_rate and not logger.handlers:
+            handler = logging.StreamHandler()
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            logger.addHandler(handler)
+            logger.setLevel(logging.INFO)
+        # First of the before_request hooks, so parse includes the others
+        # (Dash's setup on the first request, lazy page loading)
+        server.before_request_funcs.setdefault(None, []).insert(0, self._start)
+        server.after_request(self._add_header)
+
+    @staticmethod
+    def _start():
+        flask.g.request_start = time.perf_counter()
+
+    @staticmethod
+    def phases():
+        """Return {phase: seconds} of the callback of the current request, or None."""
+        timings = flask.g.get("callback_timings")
+        request_start = flask.g.get("request_start")
+        if timings is None or request_start is None or "callback" not in timings:
+            return None
+        validate = timings.get("validate", 0.0)
+        return {
+            "parse": timings["start"] - request_start,
+            "function": timings["function"] - validate,
+            "validate": validate,
+            "serialize": timings.get("serialize", 0.0),
+            "total": time.perf_counter() - request_start,
+        }
+
+    def _add_header(self, response):
+        phases = self.phases()
+        if phases is None:
+            return response
+        response.headers["Server-Timing"] = ", ".join(
+            f'{name};dur={seconds * 1000:.2f};desc="{DESCRIPTIONS[name]}"' for name, seconds in phases.items()
+        )
+        if self.log_rate and random.random() < self.log_rate:
+            output, callback, page = flask.g.callback_labels
+            record = {"output": output, "callback": callback, "page": page, "status": response.status_code,
+                      "bytes": flask.g.callback_timings["bytes"]}
+            record.update({f"{name}_ms": round(seconds * 1000, 3) for name, seconds in phases.items()})
+            logger.info(json.dumps(record))
+        return response
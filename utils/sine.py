@@ -0,0 +1,152 @@
+"""Cached sampling of y = A * sin(B * x + C) + M for the trig pages.
+
+Students click back and forth between the same few parameter combinations,
+and every click used to rebuild the x grid with np.linspace and evaluate the
+curve again. Here the grids are cached by (window, n) and the curves by
+(amp, freq, phase, center, window, n), each in a bounded LRU cache that
+counts hits, misses and evictions (served on /metrics).
+
+The returned arrays are shared between requests and threads, so they are
+read-only: a page that needs to change one makes a copy.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from utils.callback_metrics import register_cache_stats
+
+GRID_CACHE_SIZE = int(os.environ.get("MATHTUTOR_SINE_GRIDS", "32"))
+CURVE_CACHE_SIZE = int(os.environ.get("MATHTUTOR_SINE_CURVES", "512"))
+
+
+class LRUCache:
+    """A thread-safe mapping of at most maxsize entries that drops the least recently used."""
+
+    def __init__(self, name, maxsize):
+        self.name = name
+        self.maxsize = maxsize
+        self.hits = self.misses = self.evictions = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, compute):
+        """The cached value of key, or compute() stored under key."""
+        with self._lock:
+            value = self._cache.get(key)
+            if value is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return value
+            self.misses += 1
+        # Computed outside the lock; two threads missing the same key both compute it
+        value = compute()
+        with self._lock:
+            self._cache[key] = value
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._cache),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+GRIDS = LRUCache("grids", GRID_CACHE_SIZE)
+CURVES = LRUCache("curves", CURVE_CACHE_SIZE)
+CACHES = (GRIDS, CURVES)
+
+
+def _read_only(array):
+    array.flags.writeable = False
+    return array
+
+
+def grid(window, n):
+    """n evenly spaced x values from window[0] to window[1], like np.linspace."""
+    start, stop = window
+    return GRIDS.get((start, stop, n), lambda: _read_only(np.linspace(start, stop, n)))
+
+
+def curve(amp, freq, phase, center, window, n):
+    """x and y = amp * sin(freq * x + phase) + center at n points of window."""
+    x = grid(window, n)
+    y = CURVES.get((amp, freq, phase, center, window[0], window[1], n),
+                   lambda: _read_only(amp * np.sin(freq*x + phase) + center))
+    return x, y
+
+
+def stats():
+    """{cache name: size, maxsize, hits, misses, evictions and hit_rate}."""
+    return {cache.name: cache.stats() for cache in CACHES}
+
+
+register_cache_stats("sine_cache", stats, (
+    ("hits", "Lookups of sampled sine grids and curves served from the cache."),
+    ("misses", "Lookups of sampled sine grids and curves that computed them."),
+    ("evictions", "Sampled sine grids and curves dropped from the full cache."),
+))
+
+
+# Curve resolution: enough points per period for a smooth line, at most
+# POINTS_PER_PIXEL per pixel of a VIEWPORT_PIXELS wide graph
+POINTS_PER_PERIOD = 40
+POINTS_PER_PIXEL = 2
+VIEWPORT_PIXELS = 1200
+MIN_POINTS = 200
+
+
+def resolution(freq, window, pixels=VIEWPORT_PIXELS):
+    """Number of points to sample amp * sin(freq * x + phase) + center with over window.
+
+    Low frequencies need few points; at high frequencies more points than the
+    graph has pixels would not show more, the curve is capped at
+    POINTS_PER_PIXEL points per pixel.
+    """
+    periods = abs(freq) * (window[1] - window[0]) / (2*np.pi)
+    return int(min(max(MIN_POINTS, np.ceil(periods * POINTS_PER_PERIOD)), POINTS_PER_PIXEL * pixels)) + 1
+
+
+def solve(amp, freq, phase, center, y, window):
+    """Every x in window with amp * sin(freq * x + phase) + center = y.
+
+    Returns two sorted arrays, the solutions (arcsin(s) - phase) / freq + k*T
+    and (pi - arcsin(s) - phase) / freq + k*T with s = (y - center) / amp and
+    period T = 2 pi / |freq|, for every integer k that keeps them in window.
+    Both are empty if there is no solution (|y - center| > |amp|) or if the
+    curve is a horizontal line (amp or freq 0). At s = 1 or -1 the two
+    families are the same points, the second one is left empty.
+    """
+    empty = np.empty(0)
+    if amp == 0 or freq == 0:
+        return empty, empty
+    s = (y - center) / amp
+    if abs(s) > 1:
+        return empty, empty
+    period = 2*np.pi / abs(freq)
+    start, stop = window
+    bases = [(np.arcsin(s) - phase) / freq]
+    if abs(s) < 1:
+        bases.append((np.pi - np.arcsin(s) - phase) / freq)
+    families = []
+    for base in bases:
+        k = np.arange(np.ceil((start - base) / period), np.floor((stop - base) / period) + 1)
+        families.append(base + k * period)
+    if len(families) == 1:
+        families.append(empty)
+    return families[0], families[1]